@@ -18,10 +18,6 @@ import pvpumpingsystem.reservoir as rv
 import pvpumpingsystem.consumption as cs
 import pvpumpingsystem.pvpumpsystem as pvps
 
-# allows pandas to convert timestamp for matplotlib
-# import pandas as pd
-# pd.plotting.register_matplotlib_converters()
-
 # ------------ LOCATION & WEATHER FILE IMPORT ---------------
 
 # Pvlib tools can be used to import the weather file wanted. All options can
@@ -130,14 +126,16 @@ reservoir2 = rv.Reservoir(size=1000,  # [L]
 
 # represents 2880L/day ~ continuous drip irrigation of 1000m² of garden in a
 # dry climate
-consumption_cst = cs.Consumption(constant_flow=2)  # output flow rate [L/min]
+consumption_cst = cs.Consumption(constant_flow=2,  # output flow rate [L/min]
+                                 length=len(data))  # same length as weather
 
 # represents 2880L/day ~ domestic water use of 40 people
 consumption_daily = cs.Consumption(
     repeated_flow=[0, 0, 0, 0, 0, 0,
                    0, 0, 2, 1, 1, 3,
                    9, 7, 3, 3, 3, 5,
-                   6, 3, 1, 1, 0, 0])
+                   6, 3, 1, 1, 0, 0],
+    length=len(data))
 
 
 # ------------ PVPS DEFINITION -----------
@@ -182,18 +180,22 @@ truncated_tank = pvps1.water_stored['2005-02-15' <= pvps1.water_stored.index]
 truncated_tank = truncated_tank[truncated_tank.index <= '2005-02-20']
 
 # Water volume in reservoir and output flow rate
+# (numpy datetime64 arrays are given, which matplotlib handles natively and
+# faster than pandas DatetimeIndex. Local time is kept by removing timezone)
 fig, ax1 = plt.subplots()
 
 ax1.set_xlabel('time')
 ax1.set_ylabel('Water volume in tank [L]', color='r')
-ax1.plot(truncated_tank.index, truncated_tank.volume, color='r',
+ax1.plot(truncated_tank.index.tz_localize(None).values,
+         truncated_tank.volume.values, color='r',
          linewidth=1)
 ax1.tick_params(axis='y', labelcolor='r')
 
 ax2 = ax1.twinx()  # instantiate a second axes that shares the same x-axis
 
 ax2.set_ylabel('Pump output flow-rate [L/min]', color='b')
-ax2.plot(truncated_flow.index, truncated_flow.Qlpm, color='b',
+ax2.plot(truncated_flow.index.tz_localize(None).values,
+         truncated_flow.Qlpm.values, color='b',
          linewidth=1)
 ax2.tick_params(axis='y', labelcolor='b')
 
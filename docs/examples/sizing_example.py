@@ -5,8 +5,6 @@ Example of a sizing with pvpumpingsystem package.
 @author: Tanguy Lunel
 """
 
-import pvlib
-
 import pvpumpingsystem.pump as pp
 import pvpumpingsystem.pipenetwork as pn
 import pvpumpingsystem.consumption as cs
@@ -59,9 +57,10 @@ pv_database = ['Kyocera solar KU270 6MCA',
 # --------- REST OF THE SYSTEM ----------------------------------------------
 
 # Weather input
-weather_data, weather_metadata = pvlib.iotools.epw.read_epw(
-    '../../pvpumpingsystem/data/weather_files/TUN_Tunis.607150_IWEC.epw',
-    coerce_year=2005)
+weather_path = ('../../pvpumpingsystem/data/weather_files/'
+                'TUN_Tunis.607150_IWEC.epw')
+weather_data, weather_metadata = pvgen.read_epw_cached(weather_path,
+                                                       coerce_year=2005)
 # shorten the weather data by keeping the worst month only (based on GHI)
 # in order to compute faster.
 weather_data = sizing.shrink_weather_worst_month(weather_data)
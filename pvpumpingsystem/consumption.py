@@ -11,6 +11,8 @@ Defines Consumption class.
 # TODO: Implement dynamic models, where the water demand can be function of
 # the weather (irradiance (evapotranpiration) and precipitations)
 
+import functools
+import numpy as np
 import pandas as pd
 import datetime
 
@@ -23,7 +25,8 @@ class Consumption(object):
     Parameters
     ----------
     flow_rate: pd.DataFrame
-        The consumption schedule in itself [L/min]
+        The consumption schedule in itself [L/min], in a column 'Qlpm'.
+        Stored in single precision (float32).
 
     constant_flow: numeric
         Parameter allowing to build consumption data with constant consumption
@@ -32,34 +35,121 @@ class Consumption(object):
     repeated_flow: 1D array-like
         Parameter allowing to build consumption data with a repeated
         consumption through the time.
+
+    length: integer, default is 8760
+        Number of hourly time steps of the consumption data built when
+        flow_rate is None. Should match the length of the weather data
+        used, to avoid a later re-alignment of both datasets.
+
+    year: integer, default is 2005
+        Year of the first time step of the consumption data built when
+        flow_rate is None.
+
+    safety_factor: numeric, default is 1
+        Factor applied on the consumption flow rate.
+
+    Notes
+    -----
+    For numerical work, `flow_rate.Qlpm.to_numpy()` gives the flow rate as
+    a float32 numpy array, without copy.
+    The index of flow_rate is kept as given by the user.
     """
 
     def __init__(self, flow_rate=None, constant_flow=None, repeated_flow=None,
                  length=8760, year=2005, safety_factor=1):
+        # the column is built directly in its final dtype, and modified in
+        # place afterward, so as no intermediate array is allocated
         if flow_rate is None:
-            index = pd.date_range(datetime.datetime(year, 1, 1, 0),
-                                  periods=length,
-                                  freq='H')
-            self.flow_rate = pd.DataFrame(index=index, columns=('Qlpm',))
+            index = _hourly_index(year, length)
         else:
-            self.flow_rate = flow_rate
-
-        if constant_flow is not None:
-            self.flow_rate = self.flow_rate.fillna(constant_flow)
-        elif repeated_flow is not None:
-            length = len(repeated_flow)
-            for i, index in enumerate(self.flow_rate.index):
-                self.flow_rate.loc[index] = repeated_flow[i % length]
+            index = flow_rate.index
+
+        if repeated_flow is not None:
+            data = _repeat_pattern(repeated_flow, len(index))
+        elif flow_rate is None and constant_flow is not None:
+            data = np.full(len(index), constant_flow, dtype=np.float32)
+        elif flow_rate is None:
+            data = np.zeros(len(index), dtype=np.float32)
         else:
-            self.flow_rate = self.flow_rate.fillna(0)
-
-        self.flow_rate *= safety_factor
+            data = np.array(flow_rate['Qlpm'], dtype=np.float32)
+            nan_values = np.isnan(data)
+            if nan_values.any():
+                data[nan_values] = (0 if constant_flow is None
+                                    else constant_flow)
+
+        if safety_factor != 1:
+            data *= safety_factor
+        self._flow_rate = pd.DataFrame({'Qlpm': data}, index=index,
+                                       copy=False)
         self.safety_factor = safety_factor
 
+    @property
+    def flow_rate(self):
+        """
+        Consumption schedule as a pandas DataFrame with one column 'Qlpm'
+        [L/min]. The same DataFrame is returned at each access, so it can
+        be modified in place.
+
+        Values are stored as float32: about 7 significant digits, which is
+        more than enough for flow rates in L/min. Sums over the whole
+        schedule should be accumulated in float64.
+        """
+        return self._flow_rate
+
+    @flow_rate.setter
+    def flow_rate(self, value):
+        self._flow_rate = pd.DataFrame(
+            {'Qlpm': np.asarray(value['Qlpm'], dtype=np.float32)},
+            index=value.index, copy=False)
+
+    @property
+    def _qlpm(self):
+        """Flow rate [L/min] as a float32 numpy array, without copy."""
+        return self._flow_rate['Qlpm'].to_numpy()
+
+    @property
+    def index(self):
+        """Index of the consumption schedule, as given in flow_rate."""
+        return self._flow_rate.index
+
     def __repr__(self):
+        # compact, does not format the whole schedule (see __str__)
+        text = "Consumption of " + str(len(self._qlpm)) + " time steps" + \
+               "\nmean flow rate: " + \
+               '{:.3f}'.format(self._qlpm.mean(dtype=np.float64)) + " L/min"
+        return text
+
+    def __str__(self):
         return str(self.flow_rate)
 
 
+@functools.lru_cache(maxsize=8)
+def _hourly_index(year, length):
+    """
+    Hourly DatetimeIndex of `length` values starting on the 1st January
+    of `year`. Cached as it is rebuilt identically for every Consumption
+    (DatetimeIndex is immutable, so sharing it is safe).
+    """
+    return pd.date_range(datetime.datetime(year, 1, 1, 0),
+                         periods=length,
+                         freq='H')
+
+
+def _repeat_pattern(pattern, nb_data):
+    """
+    Repeats the 1D `pattern` until reaching `nb_data` values.
+    """
+    pattern = np.asarray(pattern, dtype=np.float32)
+    if len(pattern) and nb_data % len(pattern) == 0:
+        # whole number of periods (typically 24h): broadcast the pattern
+        # on a 2D view of the output
+        data = np.empty(nb_data, dtype=np.float32)
+        data.reshape(-1, len(pattern))[:] = pattern
+        return data
+    # np.resize repeats the pattern cyclically up to the size wanted
+    return np.resize(pattern, nb_data)
+
+
 def adapt_to_flow_pumped(Q_consumption, Q_pumped):
     """
     Method for shrinking the consumption flow_rate attribute
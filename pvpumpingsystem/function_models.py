@@ -4,6 +4,7 @@ Module gathering mathematical function, including typical function templates.
 
 @author: Tanguy Lunel
 """
+import inspect
 import numpy as np
 from sklearn.metrics import r2_score
 
@@ -26,7 +27,9 @@ def correlation_stats(funct_mod, params, data_input, data_to_fit):
         -'nb_data'
     """
     data_fitted = funct_mod(data_input, *params)
-    rmse = np.sqrt(sum((data_to_fit-data_fitted)**2)/len(data_to_fit))
+    residuals = np.asarray(data_to_fit - data_fitted, dtype=np.float64)
+    # dot product instead of builtin sum, which iterates in python
+    rmse = np.sqrt(residuals @ residuals / residuals.size)
     nrmse = rmse/np.mean(data_fitted)
     r_squared = r2_score(data_to_fit, data_fitted)
 
@@ -42,6 +45,42 @@ def correlation_stats(funct_mod, params, data_input, data_to_fit):
             'nb_data': nb_data}
 
 
+def linear_fit(funct_mod, data_input, data_to_fit):
+    """
+    Least-squares fitting of a model linear in its parameters, like all
+    polynomial models of this module. It replaces the iterative
+    scipy.optimize.curve_fit by one direct linear solve.
+
+    Parameters
+    ----------
+    funct_mod: function
+        Model of the form funct_mod(data_input, *params), linear in params.
+
+    data_input: array-like
+        Input data of the model, as given to funct_mod.
+
+    data_to_fit: array-like
+        Data to fit.
+
+    Returns
+    -------
+    numpy.ndarray
+        Parameters of funct_mod minimizing the sum of squared residuals.
+    """
+    nb_params = len(inspect.signature(funct_mod).parameters) - 1
+    # columns of the design matrix are the model with unit parameter vectors
+    design = np.column_stack(
+        [np.broadcast_to(funct_mod(data_input, *unit_params),
+                         np.shape(data_to_fit))
+         for unit_params in np.eye(nb_params)])
+    # scaling of columns improves the conditioning of the problem
+    scale = np.linalg.norm(design, axis=0)
+    scale[scale == 0] = 1
+    params, _, _, _ = np.linalg.lstsq(design / scale, data_to_fit,
+                                      rcond=None)
+    return params / scale
+
+
 def compound_polynomial_1_2(input_val, a1, a2, a3, b1, b2, b3):
     """
     Model of a compound polynomial function made of a global equation of
@@ -76,7 +115,7 @@ def compound_polynomial_2_2(input_val, a1, a2, a3, b1, b2, b3, c1, c2, c3):
     a = polynomial_2(y, a1, a2, a3)
     b = polynomial_2(y, b1, b2, b3)
     c = polynomial_2(y, c1, c2, c3)
-    return a + b*x + c*x**2
+    return a + x*(b + x*c)
 
 
 def compound_polynomial_2_3(input_val, a1, a2, a3, a4, b1, b2, b3, b4,
@@ -90,7 +129,7 @@ def compound_polynomial_2_3(input_val, a1, a2, a3, a4, b1, b2, b3, b4,
     a = polynomial_3(y, a1, a2, a3, a4)
     b = polynomial_3(y, b1, b2, b3, b4)
     c = polynomial_3(y, c1, c2, c3, c4)
-    return a + b*x + c*x**2
+    return a + x*(b + x*c)
 
 
 def compound_polynomial_3_3(input_val, a1, a2, a3, a4, b1, b2, b3, b4,
@@ -105,7 +144,7 @@ def compound_polynomial_3_3(input_val, a1, a2, a3, a4, b1, b2, b3, b4,
     b = polynomial_3(y, b1, b2, b3, b4)
     c = polynomial_3(y, c1, c2, c3, c4)
     d = polynomial_3(y, d1, d2, d3, d4)
-    return a + b*x + c*x**2 + d*x**3
+    return a + x*(b + x*(c + x*d))
 
 
 def polynomial_multivar_3_3_4(input_val, y_intercept, a1, a2, a3, b1, b2, b3,
@@ -115,9 +154,9 @@ def polynomial_multivar_3_3_4(input_val, y_intercept, a1, a2, a3, b1, b2, b3,
     and with 1 interaction term.
     """
     x, y = input_val[0], input_val[1]
-    return y_intercept + a1*x + a2*x**2 + a3*x**3 \
-        + b1*y + b2*y**2 + b3*y**3 \
-        + c1*x*y + c2*x**2*y + c3*x*y**2 + c4*x**2*y**2
+    # Horner form on each variable, interaction terms factorized by x*y
+    return y_intercept + x*(a1 + x*(a2 + x*a3)) + y*(b1 + y*(b2 + y*b3)) \
+        + x*y*(c1 + x*c2 + y*(c3 + x*c4))
 
 
 def polynomial_multivar_3_3_1(input_val, y_intercept, a1, a2, a3, b1, b2, b3,
@@ -127,8 +166,8 @@ def polynomial_multivar_3_3_1(input_val, y_intercept, a1, a2, a3, b1, b2, b3,
     and with 1 interaction term.
     """
     x, y = input_val[0], input_val[1]
-    return y_intercept + a1*x + a2*x**2 + a3*x**3 + \
-        b1*y + b2*y**2 + b3*y**3 + c1*x*y
+    return y_intercept + x*(a1 + x*(a2 + x*a3)) + \
+        y*(b1 + y*(b2 + y*b3)) + c1*x*y
 
 
 def polynomial_multivar_2_2_1(input_val, y_intercept, a1, a2, b1, b2, c1):
@@ -137,7 +176,7 @@ def polynomial_multivar_2_2_1(input_val, y_intercept, a1, a2, b1, b2, c1):
     and with 1 interaction term.
     """
     x, y = input_val[0], input_val[1]
-    return y_intercept + a1*x + a2*x**2 + b1*y + b2*y**2 + c1*x*y
+    return y_intercept + x*(a1 + x*a2) + y*(b1 + y*b2) + c1*x*y
 
 
 def polynomial_multivar_2_2_0(input_val, y_intercept, a1, a2, b1, b2):
@@ -146,7 +185,7 @@ def polynomial_multivar_2_2_0(input_val, y_intercept, a1, a2, b1, b2):
     and with no interaction term.
     """
     x, y = input_val[0], input_val[1]
-    return y_intercept + a1*x + a2*x**2 + b1*y + b2*y**2
+    return y_intercept + x*(a1 + x*a2) + y*(b1 + y*b2)
 
 
 def polynomial_multivar_1_1_0(input_val, y_intercept, a1, b1):
@@ -171,28 +210,32 @@ def polynomial_5(x, y_intercept, a, b, c, d, e):
     """
     Model of a polynomial function of fifth order.
     """
-    return y_intercept + a*x + b*x**2 + c*x**3 + d*x**4 + e*x**5
+    # Horner's method
+    return y_intercept + x*(a + x*(b + x*(c + x*(d + x*e))))
 
 
 def polynomial_4(x, y_intercept, a, b, c, d):
     """
     Model of a polynomial function of fourth order.
     """
-    return y_intercept + a*x + b*x**2 + c*x**3 + d*x**4
+    # Horner's method
+    return y_intercept + x*(a + x*(b + x*(c + x*d)))
 
 
 def polynomial_3(x, y_intercept, a, b, c):
     """
     Model of a polynomial function of third order.
     """
-    return y_intercept + a*x + b*x**2 + c*x**3
+    # Horner's method
+    return y_intercept + x*(a + x*(b + x*c))
 
 
 def polynomial_2(x, y_intercept, a, b):
     """
     Model of a polynomial function of second order.
     """
-    return y_intercept + a*x + b*x**2
+    # Horner's method
+    return y_intercept + x*(a + x*b)
 
 
 def polynomial_1(x, y_intercept, a):
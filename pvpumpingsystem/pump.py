@@ -7,22 +7,27 @@ Module defining class and functions for modeling the pump.
 """
 # flake8: noqa: F523
 
+import functools
+import os
 import numpy as np
 import pandas as pd
 from itertools import count
-from matplotlib.pyplot import plot
-import matplotlib.pyplot as plt
-# following line needed for plotting in 3d:
-from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
 import scipy.optimize as opt
 import warnings
 import re
 
 # pvpumpingsystem modules:
-from pvpumpingsystem import inverse
 from pvpumpingsystem import errors
 from pvpumpingsystem import function_models
 
+# separators of the name, value and comment of the header lines of the
+# pump files
+_METADATA_SEP = re.compile(':|#')
+
+# electrical architectures of the motors handled by the models
+_VALID_ELEC_ARCHIS = frozenset({'permanent_magnet', 'series_excited',
+                                'shunt_excited', 'separately_excited'})
+
 # FIXME: doc states lpm, tdh, current, because they can be used for creating
 # object with __init__(), but not available anymore then as attribute.
 # What is the proper way to document it?
@@ -53,8 +58,8 @@ class Pump:
     controller: str, default is None
         Name of controller
 
-    voltage_list: None or list,
-        list of voltage (the keys of preceding dictionaries) [V]
+    voltage_list: None or numpy.ndarray,
+        sorted array of the distinct voltages of the specs [V]
 
     specs: None or pandas.DataFrame,
         Dataframe with columns of following numeric:
@@ -85,7 +90,8 @@ class Pump:
 
         # retrieve pump data from txt datasheet given by path
         self.specs, metadata = get_data_pump(path)
-        self.voltage_list = self.specs.voltage.drop_duplicates()
+        # the specs are sorted by voltage, np.unique keeps the same order
+        self.voltage_list = np.unique(self.specs.voltage.to_numpy())
         # retrieve price, or overwrite it if given in __init__
         try:
             self.price = float(metadata['price'])
@@ -115,33 +121,41 @@ class Pump:
             self.motor_electrical_architecture = \
                 motor_electrical_architecture
 
-        # complete power and efficiency data
+        # complete power and efficiency data. The checks are done on the
+        # numpy arrays of the columns (with a NaN, np.ptp is NaN and the
+        # column is not considered as constant, as with pandas before).
         if 'efficiency' not in self.specs.columns or \
-                self.specs.efficiency.isna().any():
+                np.isnan(self.specs.efficiency.to_numpy()).any():
             # Case with 1 curve Q vs TDH , but only 1 (I,V) point given
-            if (self.specs.current == self.specs.current.max()).all() and \
-                    (self.specs.voltage == self.specs.voltage.max()).all():
+            if np.ptp(self.specs.current.to_numpy()) == 0 and \
+                    np.ptp(self.specs.voltage.to_numpy()) == 0:
                 self.specs = _extrapolate_pow_eff_with_cst_efficiency(
                         self.specs, efficiency_coeff=1)
             # Case with Q&P vs TDH given at 1 or multiple voltage
             else:
                 # complete column 'power' if needed
                 if 'power' not in self.specs.columns or \
-                        self.specs.power.isna().any():
-                    self.specs['power'] = self.specs.voltage \
-                        * self.specs.current
+                        np.isnan(self.specs.power.to_numpy()).any():
+                    self.specs['power'] = self.specs.voltage.to_numpy() \
+                        * self.specs.current.to_numpy()
                 # complete column 'efficiency'
-                self.specs['efficiency'] = (
-                    ((self.specs.flow/60000) * self.specs.tdh * 9.81 * 1000)
-                    / self.specs.power)
-
-        # compute the ranges for each parameters of the specs
-        self.range = pd.DataFrame([self.specs.max(), self.specs.min()],
-                                  index=['max', 'min'])
+                efficiency = _hydraulic_power(self.specs)
+                efficiency /= self.specs.power.to_numpy()
+                self.specs['efficiency'] = efficiency
+
+        # compute the ranges for each parameters of the specs, with one
+        # reduction on the 2D array of the specs (NaN skipped as in pandas)
+        specs_values = self.specs.to_numpy(dtype=np.float64)
+        self.range = pd.DataFrame([np.nanmax(specs_values, axis=0),
+                                   np.nanmin(specs_values, axis=0)],
+                                  index=['max', 'min'],
+                                  columns=self.specs.columns)
 
         self.data_completeness = specs_completeness(
                 self.specs,
                 self.motor_electrical_architecture)
+        # validity domains, only depending on specs, see _intervals()
+        self._domains_cache = {}
 
         # triggers the calculation of the pump model with decorator below
         self.modeling_method = modeling_method
@@ -159,41 +173,63 @@ class Pump:
     # setter: allows to recalculate attribute coeffs when changing the method
     @modeling_method.setter
     def modeling_method(self, model):
-        if model.lower() == 'kou':
-            self.coeffs = _curves_coeffs_Kou98(
-                    self.specs, self.data_completeness)
-        elif model.lower() == 'arab':
-            self.coeffs = _curves_coeffs_Arab06(
-                    self.specs, self.data_completeness)
-        elif model.lower() == 'hamidat':
-            self.coeffs = _curves_coeffs_Hamidat08(
-                    self.specs, self.data_completeness)
-        elif model.lower() == 'theoretical':
-            self.coeffs = _curves_coeffs_theoretical(
-                    self.specs, self.data_completeness,
-                    self.motor_electrical_architecture,
-                    force_model='flexible')
-        elif model.lower() == 'theoretical_cst_efficiency':
-            self.coeffs = _curves_coeffs_theoretical(
-                    self.specs, self.data_completeness,
-                    self.motor_electrical_architecture,
-                    force_model='constant_efficiency')
-        elif model.lower() == 'theoretical_basic':
-            self.coeffs = _curves_coeffs_theoretical(
-                    self.specs, self.data_completeness,
-                    self.motor_electrical_architecture,
-                    force_model='basic')
-        elif model.lower() == 'theoretical_var_efficiency':
-            self.coeffs = _curves_coeffs_theoretical(
-                    self.specs, self.data_completeness,
-                    self.motor_electrical_architecture,
-                    force_model='variable_efficiency')
-        else:
-            raise NotImplementedError(
-                "The requested modeling method is not available. Check your "
-                "spelling, or choose between the following: {0}".format(
-                        'kou', 'arab', 'hamidat', 'theoretical'))  # noqa: F523
+        self.coeffs = _curves_coeffs(self.specs, self.data_completeness,
+                                     self.motor_electrical_architecture,
+                                     model)
         self._modeling_method = model
+        # models built with the former coefficients are not valid anymore
+        self._functions_cache = {}
+
+    def __getstate__(self):
+        # the cached closures cannot be pickled, they are rebuilt on demand
+        state = self.__dict__.copy()
+        state['_functions_cache'] = {}
+        state['_domains_cache'] = {}
+        return state
+
+    def _model_function(self, name, builders, default=None):
+        """
+        Returns the function 'name' of the current modeling method, built
+        by the method given by the dict 'builders' (or 'default'). The
+        modeling method is only looked up in 'builders' the first time,
+        the result is then cached.
+        """
+        try:
+            return self._functions_cache[name]
+        except KeyError:
+            builder = builders.get(self.modeling_method, default)
+        if builder is None:
+            raise NotImplementedError(
+                "The function {0} corresponding to the requested "
+                "modeling method is not available yet, need to "
+                "implemented another valid method.".format(name))
+        return self._cached_function(name, lambda: builder(self))
+
+    def _cached_function(self, name, builder):
+        """
+        Returns the output of builder(), computed only once per modeling
+        method. The specs and coeffs must therefore not be modified in
+        place after the construction of the pump.
+        """
+        if name not in self._functions_cache:
+            self._functions_cache[name] = builder()
+        return self._functions_cache[name]
+
+    def _intervals(self, variables):
+        """
+        Returns the domain of validity of the pump on ('V', 'H') if
+        variables is 'VH', or on ('P', 'H') if variables is 'PH'. It only
+        depends on the specs, so it is computed once per pump and shared by
+        all the modeling methods.
+        """
+        if variables not in self._domains_cache:
+            if variables == 'VH':
+                dom = _domain_V_H(self.specs, self.data_completeness)
+            else:
+                dom = _domain_P_H(self.specs, self.data_completeness)
+            self._domains_cache[variables] = {variables[0]: dom[0],
+                                              'H': dom[1]}
+        return self._domains_cache[variables]
 
     # TODO: work on following function
     def starting_characteristics(self, tdh, motor_electrical_architecture):
@@ -238,13 +274,10 @@ class Pump:
 
         fctI, intervals = self.functIforVH()
 
-        Vvect = np.linspace(min(intervals['V'](head)),
-                            max(intervals['V'](head)),
-                            nbpoint)
-        Ivect = np.zeros(nbpoint)
-
-        for i, V in enumerate(Vvect):
-            Ivect[i] = fctI(V, head)
+        v_interval = intervals['V'](head)
+        Vvect = np.linspace(min(v_interval), max(v_interval), nbpoint)
+        # whole voltage range computed at once
+        Ivect = np.asarray(fctI(Vvect, head), dtype=np.float64)
 
         return {'I': Ivect, 'V': Vvect}
 
@@ -262,20 +295,11 @@ class Pump:
                 range of one depends on the other, or fixed ranges.
         """
 
-        if self.modeling_method == 'kou':
-            return self.functIforVH_Kou()
-        if self.modeling_method == 'arab':
-            return self.functIforVH_Arab()
-        if self.modeling_method == 'theoretical':
-            return self.functIforVH_theoretical()
         if self.modeling_method == 'hamidat':
             raise NotImplementedError(
                 "Hamidat method does not provide model for functIforVH.")
-        else:
-            raise NotImplementedError(
-                "The function functIforVH corresponding to the requested "
-                "modeling method is not available yet, need to "
-                "implemented another valid method.")
+        return self._model_function('functIforVH',
+                                    self._functIforVH_builders)
         # TODO: Standardize output of functionIforVH with output of QforPH?
 
     def functIforVH_Arab(self):
@@ -285,7 +309,7 @@ class Pump:
         Check out :py:func:`_curves_coeffs_Arab06` for more details.
         """
 
-        coeffs = self.coeffs['coeffs_f1']
+        coeffs = _coeffs_as_floats(self.coeffs['coeffs_f1'])
 
         if self.data_completeness['data_number'] >= 12 \
                 and self.data_completeness['voltage_number'] >= 3:
@@ -294,31 +318,18 @@ class Pump:
             funct_mod = function_models.compound_polynomial_1_2
 
         # domain of V and tdh and gathering in one single variable
-        dom = _domain_V_H(self.specs, self.data_completeness)
-        intervals = {'V': dom[0],
-                     'H': dom[1]}
+        intervals = self._intervals('VH')
 
         def functI(V, H, error_raising=True):
             """Function giving voltage V according to current I and tdh H.
+            V and H can be numeric or array-like (broadcast together).
 
             Error_raising parameter allows to check the given values
             according to the possible intervals and to raise errors if not
             corresponding.
             """
             if error_raising is True:
-                # check if the head is available for the pump
-                v_max = intervals['V'](0)[1]
-                if not 0 <= H <= intervals['H'](v_max)[1]:
-                    raise errors.HeadError(
-                            'H (={0}) is out of bounds for this pump. '
-                            'H should be in the interval {1}.'
-                            .format(H, intervals['H'](v_max)))
-                # check if there is enough current for given head
-                if not intervals['V'](H)[0] <= V <= intervals['V'](H)[1]:
-                    raise errors.VoltageError(
-                            'V (={0}) is out of bounds. For this specific '
-                            'head H (={1}), V should be in the interval {2}'
-                            .format(V, H, intervals['V'](H)))
+                _check_VH_in_domain(V, H, intervals)
             return funct_mod([V, H], *coeffs)
 
         return functI, intervals
@@ -330,35 +341,22 @@ class Pump:
         Check out :py:func:`_curves_coeffs_Kou98` for more details.
         """
 
-        coeffs = self.coeffs['coeffs_f1']
+        coeffs = _coeffs_as_floats(self.coeffs['coeffs_f1'])
         funct_mod = function_models.polynomial_multivar_3_3_4
 
         # domain of V and tdh and gathering in one single variable
-        dom = _domain_V_H(self.specs, self.data_completeness)
-        intervals = {'V': dom[0],
-                     'H': dom[1]}
+        intervals = self._intervals('VH')
 
         def functI(V, H, error_raising=True):
             """Function giving voltage V according to current I and tdh H.
+            V and H can be numeric or array-like (broadcast together).
 
             Error_raising parameter allows to check the given values
             according to the possible intervals and to raise errors if not
             corresponding.
             """
             if error_raising is True:
-                # check if the head is available for the pump
-                v_max = intervals['V'](0)[1]
-                if not 0 <= H <= intervals['H'](v_max)[1]:
-                    raise errors.HeadError(
-                            'H (={0}) is out of bounds for this pump. '
-                            'H should be in the interval {1}.'
-                            .format(H, intervals['H'](v_max)))
-                # check if there is enough current for given head
-                if not intervals['V'](H)[0] <= V <= intervals['V'](H)[1]:
-                    raise errors.VoltageError(
-                            'V (={0}) is out of bounds. For this specific '
-                            'head H (={1}), V should be in the interval {2}'
-                            .format(V, H, intervals['V'](H)))
+                _check_VH_in_domain(V, H, intervals)
             return funct_mod([V, H], *coeffs)
 
         return functI, intervals
@@ -370,53 +368,32 @@ class Pump:
         Check out :py:func:`_curves_coeffs_theoretical` for more details.
         """
 
-        coeffs = self.coeffs['coeffs_f1']
-
-        def funct_mod(input_values, R_a, beta_0, beta_1, beta_2):
-            """Returns the equation v(i, h).
-            """
-            i, h = input_values
-            funct_mod_beta = function_models.polynomial_2
-            beta = funct_mod_beta(h, beta_0, beta_1, beta_2)
-            return R_a*i + beta*np.sqrt(i)
+        R_a, beta_0, beta_1, beta_2 = _coeffs_as_floats(
+            self.coeffs['coeffs_f1'])
 
         # domain of V and tdh and gathering in one single variable
-        dom_VH = _domain_V_H(self.specs, self.data_completeness)
-        intervals_VH = {'V': dom_VH[0],
-                        'H': dom_VH[1]}
+        intervals_VH = self._intervals('VH')
+
+        def functI(V, H, error_raising=True):
+            """Inverse function of the model V = R_a*I + beta(H)*sqrt(I).
+            V and H can be numeric or array-like.
 
-        def functV(i, H, error_raising=True):
-            """Function giving current I according to voltage V and tdh H,
-            as theoretical model enables
+            The model is a second order equation on sqrt(I), so it is
+            inverted analytically, and at once for all values of V.
             """
-            # No need of error_raising because this function is only used
-            # for being inversed numerically after
             if error_raising is True:
-                pass
-            return funct_mod([i, H], *coeffs)
+                _check_VH_in_domain(V, H, intervals_VH)
 
-        def functI(V, H, error_raising=True):
-            """Inverse function of functV.
-            Note that functV must be strictly monotonic."""
-            inv_fun = inverse.inversefunc(functV,
-                                          args=(H, False))
+            V = np.asarray(V, dtype=np.float64)
+            H = np.asarray(H, dtype=np.float64)
+            beta = beta_0 + H*(beta_1 + H*beta_2)
+            # root of R_a*x**2 + beta*x - V on the monotonic branch of the
+            # model, written without cancellation when R_a is small or null
+            sqrt_I = 2*V / (beta + np.sqrt(beta**2 + 4*R_a*V))
 
-            if error_raising is True:
-                # check if the head is available for the pump
-                v_max = intervals_VH['V'](0)[1]
-                if not 0 <= H <= intervals_VH['H'](v_max)[1]:
-                    raise errors.HeadError(
-                            'H (={0}) is out of bounds for this pump. '
-                            'H should be in the interval {1}.'
-                            .format(H, intervals_VH['H'](v_max)))
-                # check if there is enough current for given head
-                if not intervals_VH['V'](H)[0] <= V <= intervals_VH['V'](H)[1]:
-                    raise errors.VoltageError(
-                            'V (={0}) is out of bounds. For this specific '
-                            'head H (={1}), V should be in the interval {2}'
-                            .format(V, H, intervals_VH['V'](H)))
-
-            return float(inv_fun(V))  # type casting to standardize with rest
+            if np.ndim(sqrt_I) == 0:
+                return float(sqrt_I**2)  # type casting to standardize
+            return np.asarray(sqrt_I**2, dtype=np.float64)
 
         return functI, intervals_VH
 
@@ -425,20 +402,32 @@ class Pump:
         Function redirecting to functQforPH. It first computes P with
         functIforVH(), and then reinjects it into functQforPH().
         """
+        return self._cached_function('functQforVH', self._functQforVH)
+
+    def _functQforVH(self):
+        # the models of f1 and f2 are shared with functIforVH() and
+        # functQforPH(), as well as the domain on V and H of f1. They are
+        # only got at the first call, so that a modeling method without
+        # f1 (like 'hamidat') raises when functQ is called, as before
+        intervals = self._intervals('VH')
+        models = []
 
         def functQ(V, H):
-            f1, _ = self.functIforVH()
-            f2, _ = self.functQforPH()
-            try:
-                cur = f1(V, H)
-            except (errors.VoltageError, errors.HeadError):
-                cur = np.nan
+            if not models:
+                models.extend((self.functIforVH()[0], self.functQforPH()[0]))
+            f1, f2 = models
+            # out of the domain of f1, the current is NaN. Checked with a
+            # mask rather than by catching the errors raised by f1
+            valid = _VH_domain_mask(V, H, intervals)
+            if valid.ndim == 0:
+                cur = f1(V, H, error_raising=False) if valid else np.nan
+            else:
+                V, H = np.broadcast_arrays(np.asarray(V, dtype=np.float64),
+                                           np.asarray(H, dtype=np.float64))
+                cur = np.full(valid.shape, np.nan)
+                cur[valid] = f1(V[valid], H[valid], error_raising=False)
             return f2(V*cur, H)
 
-        dom = _domain_V_H(self.specs, self.data_completeness)
-        intervals = {'V': dom[0],
-                     'H': dom[1]}
-
         return functQ, intervals
 
     def functQforPH(self):
@@ -449,24 +438,17 @@ class Pump:
         -------
         tuple
             - the function giving Q according to power P and head H
-                for the pump: Q = f2(P, H)
+                for the pump: Q = f2(P, H). Q is never negative: where the
+                curve fit extrapolates badly to a negative flow rate, 0 is
+                returned, in the domain of P as well as above it.
             - the domains of validity for P and H. Can be functions, so as the
                 range of one depends on the other, or fixed ranges.
         """
 
-        if self.modeling_method == 'kou':
-            return self.functQforPH_Kou()
-        if self.modeling_method == 'arab':
-            return self.functQforPH_Arab()
-        if self.modeling_method == 'hamidat':
-            return self.functQforPH_Hamidat()
-        if self.modeling_method == 'theoretical' or 'theoretical_basic':
-            return self.functQforPH_theoretical()
-        else:
-            raise NotImplementedError(
-                "The function functQforPH corresponding to the requested "
-                "modeling method is not available yet, need to "
-                "implemented another valid method.")
+        # all the theoretical variants use the same model
+        return self._model_function('functQforPH',
+                                    self._functQforPH_builders,
+                                    default=Pump.functQforPH_theoretical)
 
     def functQforPH_Hamidat(self):
         """
@@ -474,47 +456,32 @@ class Pump:
 
         Check out :py:func:`_curves_coeffs_Hamidat08` for more details.
         """
-        coeffs = self.coeffs['coeffs_f2']
-
-        funct_mod_P = function_models.compound_polynomial_3_3
+        coeffs = _coeffs_as_floats(self.coeffs['coeffs_f2'])
 
-        def funct_P(Q, power, head):
-            """Function supposed to equal 0, used for finding numerically the
-            value of flow-rate depending on power.
+        def solve_Q(power, head):
+            """Finds numerically the flow-rate Q for which the model
+            P(Q, H) equals power, with the secant method, on arrays.
             """
-            return funct_mod_P([Q, head], *coeffs) - power
-
-        dom = _domain_P_H(self.specs, self.data_completeness)
-        intervals = {'P': dom[0],
-                     'H': dom[1]}
-
-        def functQ(P, H):
-            # check if head is in available range (NOT redundant with rest)
-            if H > intervals['H'](P)[1]:
-                Q = 0
-                P_unused = P
-            # check if P is insufficient
-            if P < intervals['P'](H)[0]:
-                Q = 0
-                P_unused = P
-            # if P is in available range
-            elif intervals['P'](H)[0] <= P <= intervals['P'](H)[1]:
-                # Newton-Raphson numeraical method:
-                # actually fprime should be given for using Newton-Raphson
-                Q = opt.newton(funct_P, 5, args=(P, H))
-                P_unused = 0  # power unused for pumping
-            # if P is more than maximum
-            elif intervals['P'](H)[1] < P:
-                Pmax = intervals['P'](H)[1]
-                Q = opt.newton(funct_P, 5, args=(Pmax, H))
-                if Q < 0:  # Case where extrapolation from curve fit is bad
-                    Q = 0
-                P_unused = P - Pmax
-            # if P is NaN or other
-            else:
-                Q = np.nan
-                P_unused = np.nan
-            return {'Q': Q, 'P_unused': P_unused}
+            # at a given head, the compound polynomial is a polynomial
+            # on Q, of which coefficients are third order equations on H
+            a, b, c, d = [k0 + head*(k1 + head*(k2 + head*k3))
+                          for k0, k1, k2, k3 in zip(*[iter(coeffs)] * 4)
+                          ] + [0.] * (4 - len(coeffs) // 4)
+            a = a - power
+
+            def cubic(Q):
+                return a + Q*(b + Q*(c + Q*d))
+
+            if np.size(a) == 1:
+                # single point, typically one time step of a simulation:
+                # the scalar secant of scipy has a lower overhead
+                a, b, c, d = [np.asarray(k).item() for k in (a, b, c, d)]
+                return np.array([opt.newton(cubic, 5)])
+            return _secant_roots(cubic, np.full(np.shape(a), 5.))
+
+        intervals = self._intervals('PH')
+        # the head limit has never been applied with this model
+        functQ = _functQ_in_domain(solve_Q, intervals, head_limit=False)
 
         return functQ, intervals
 
@@ -526,7 +493,7 @@ class Pump:
 
         """
 
-        coeffs = self.coeffs['coeffs_f2']
+        coeffs = _coeffs_as_floats(self.coeffs['coeffs_f2'])
         if len(coeffs) == 12:
             funct_mod = function_models.compound_polynomial_2_3
         elif len(coeffs) == 9:
@@ -535,37 +502,12 @@ class Pump:
             funct_mod = function_models.compound_polynomial_1_3
 
         # domain of V and tdh and gathering in one single variable
-        dom = _domain_P_H(self.specs, self.data_completeness)
-        intervals = {'P': dom[0],
-                     'H': dom[1]}
-
-        def functQ(P, H):
-            # check if head is in available range (NOT redundant with rest)
-            if H > intervals['H'](P)[1]:
-                Q = 0
-                P_unused = P
-            # check if P is insufficient
-            elif P < intervals['P'](H)[0]:
-                Q = 0
-                P_unused = P
-            # if P is in available range
-            elif intervals['P'](H)[0] <= P <= intervals['P'](H)[1]:
-                Q = funct_mod([P, H], *coeffs)
-                P_unused = 0
-                if Q < 0:  # Case where extrapolation from curve fit is bad
-                    Q = 0
-            # if P is more than maximum
-            elif intervals['P'](H)[1] < P:
-                Pmax = intervals['P'](H)[1]
-                Q = funct_mod([Pmax, H], *coeffs)
-                P_unused = P - Pmax
-            # if P is NaN or other
-            else:
-                Q = np.nan
-                P_unused = np.nan
-            return {'Q': Q, 'P_unused': P_unused}
+        intervals = self._intervals('PH')
 
-        return functQ, intervals
+        def funct(P, H):
+            return funct_mod([P, H], *coeffs)
+
+        return _functQ_in_domain(funct, intervals), intervals
 
     def functQforPH_Kou(self):
         """
@@ -574,40 +516,17 @@ class Pump:
         Check out :py:func:`_curves_coeffs_Kou98` for more details.
         """
 
-        coeffs = self.coeffs['coeffs_f2']
+        coeffs = _coeffs_as_floats(self.coeffs['coeffs_f2'])
         funct_mod = function_models.polynomial_multivar_3_3_4
 
         # domain of V and tdh and gathering in one single variable
-        dom = _domain_P_H(self.specs, self.data_completeness)
-        intervals = {'P': dom[0],
-                     'H': dom[1]}
-
-        def functQ(P, H):
-            # check if head is in available range (NOT redundant with rest)
-            if H > intervals['H'](P)[1]:
-                Q = 0
-                P_unused = P
-            # check if P is insufficient
-            if P < intervals['P'](H)[0]:
-                Q = 0
-                P_unused = P
-            # if P is in available range
-            elif intervals['P'](H)[0] <= P <= intervals['P'](H)[1]:
-                Q = funct_mod([P, H], *coeffs)
-                P_unused = 0
-            # if P is more than maximum
-            elif intervals['P'](H)[1] < P:
-                Pmax = intervals['P'](H)[1]
-                Q = funct_mod([Pmax, H], *coeffs)
-                if Q < 0:  # Case where extrapolation from curve fit is bad
-                    Q = 0
-                P_unused = P - Pmax
-            # if P is NaN or other
-            else:
-                Q = np.nan
-                P_unused = np.nan
-            return {'Q': Q, 'P_unused': P_unused}
+        intervals = self._intervals('PH')
+
+        def funct(P, H):
+            return funct_mod([P, H], *coeffs)
 
+        # the head limit has never been applied with this model
+        functQ = _functQ_in_domain(funct, intervals, head_limit=False)
         return functQ, intervals
 
     def functQforPH_theoretical(self):
@@ -627,41 +546,26 @@ class Pump:
                 P, H = input_values
                 return mean_efficiency * (60000 * P) / (H * 9.81 * 1000)
 
-        coeffs = self.coeffs['coeffs_f2']
+        coeffs = _coeffs_as_floats(self.coeffs['coeffs_f2'])
 
         # domain of V and tdh and gathering in one single variable
-        dom = _domain_P_H(self.specs, self.data_completeness)
-        intervals = {'P': dom[0],
-                     'H': dom[1]}
-
-        def functQ(P, H):
-            # check if head is in available range (NOT redundant with rest)
-            if H > intervals['H'](P)[1]:
-                Q = 0
-                P_unused = P
-            # check if P is insufficient
-            if P < intervals['P'](H)[0]:
-                Q = 0
-                P_unused = P
-            # if P is in available range
-            elif intervals['P'](H)[0] <= P <= intervals['P'](H)[1]:
-                Q = funct_mod([P, H], *coeffs)
-                if Q < 0:  # Case where extrapolation from curve fit is bad
-                    Q = 0
-                P_unused = 0
-            # if P is more than maximum
-            elif intervals['P'](H)[1] < P:
-                Pmax = intervals['P'](H)[1]
-                Q = funct_mod([Pmax, H], *coeffs)
-                P_unused = P - Pmax
-            # if P is NaN or other
-            else:
-                Q = np.nan
-                P_unused = np.nan
-            return {'Q': Q, 'P_unused': P_unused}
+        intervals = self._intervals('PH')
+
+        def funct(P, H):
+            return funct_mod([P, H], *coeffs)
 
+        # the head limit has never been applied with this model
+        functQ = _functQ_in_domain(funct, intervals, head_limit=False)
         return functQ, intervals
 
+    # methods building the model functions, by modeling method
+    _functIforVH_builders = {'kou': functIforVH_Kou,
+                             'arab': functIforVH_Arab,
+                             'theoretical': functIforVH_theoretical}
+    _functQforPH_builders = {'kou': functQforPH_Kou,
+                             'arab': functQforPH_Arab,
+                             'hamidat': functQforPH_Hamidat}
+
 
 def get_data_pump(path):
     """
@@ -680,6 +584,19 @@ def get_data_pump(path):
     tuple
         A pandas.DataFrame containing the specifications (voltage, flow,
         current, tdh, power) and a dict with the metadata of the pump.
+        The rows are sorted by voltage.
+    """
+    # the parsing is cached, copies avoid sharing data between pumps
+    data_df, metadata = _read_pump_file(os.path.abspath(path),
+                                        os.path.getmtime(path))
+    return data_df.copy(), dict(metadata)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_pump_file(path, mtime):
+    """
+    Parses the pump file at path. The modification time 'mtime' is only
+    part of the cache key, so that a modified file is parsed again.
     """
     # open in read-only option
     with open(path, 'r') as csvdata:
@@ -697,13 +614,27 @@ def get_data_pump(path):
 
             # remove carriage return and split at ':'.
             # .strip() removes leading or trailing whitespace
-            content = re.split(':|#', line.rstrip('\n'))
+            content = _METADATA_SEP.split(line.rstrip('\n'), maxsplit=2)
             metadata[content[0].lower().strip()] = content[1].strip()
 
         # Import data
         # header=0 because firstline already read before
         data_df = pd.read_csv(csvdata, sep='\t', header=0, comment='#')
 
+    # numeric columns all stored as float64, so that each one is a
+    # contiguous float64 array usable by numpy without conversion
+    data_df = data_df.astype(
+        {col: np.float64 for col in data_df.columns
+         if pd.api.types.is_numeric_dtype(data_df[col])})
+
+    # rows of a same voltage are made contiguous, so that the data can be
+    # split by voltage with slices. The stable sort keeps the order of the
+    # datasheet for each voltage.
+    if pd.api.types.is_numeric_dtype(data_df.voltage) \
+            and not data_df.voltage.is_monotonic_increasing:
+        data_df = data_df.sort_values('voltage', kind='mergesort',
+                                      ignore_index=True)
+
     return data_df, metadata
 
 
@@ -741,32 +672,26 @@ def specs_completeness(specs,
             A valid electrical architecture for the motor is given
     """
 
-    valid_elec_archi = (motor_electrical_architecture in (
-            'permanent_magnet', 'series_excited', 'shunt_excited',
-            'separately_excited'))
+    valid_elec_archi = motor_electrical_architecture in _VALID_ELEC_ARCHIS
 
-    # nb voltages
-    voltages = specs.voltage.drop_duplicates()
-    volt_nb = len(voltages)
+    # nb voltages (NaN counted as a voltage, as it was with drop_duplicates)
+    volt_nb = specs.voltage.nunique(dropna=False)
 
-    # flow data completeness (ideally goes until zero)
-    lpm_ratio = []
-    for v in voltages:
-        lpm_ratio.append(min(specs[specs.voltage == v].flow)
-                         / max(specs[specs.voltage == v].flow))
-    mean_lpm_ratio = np.mean(lpm_ratio)
+    # flow data completeness (ideally goes until zero), with the extreme
+    # flow rates of all the voltages computed in one groupby
+    flow_by_voltage = specs.groupby('voltage', sort=False).flow.agg(
+        ['min', 'max'])
+    mean_lpm_ratio = np.mean(flow_by_voltage['min'].to_numpy()
+                             / flow_by_voltage['max'].to_numpy())
 
     # nb heads
-    heads = specs.tdh.drop_duplicates()
-    heads_nb = len(heads)
+    heads_nb = specs.tdh.nunique(dropna=False)
 
     # head data completeness (minimum tdh should be 0 ideally)
     head_ratio = min(specs.tdh)/max(specs.tdh)
 
-    data_number = 0
-    for v in voltages:
-        for i in specs[specs.voltage == v].flow:
-            data_number += 1
+    # number of data points, i.e. of rows with a voltage given
+    data_number = int(specs.voltage.notna().sum())
 
     return {'voltage_number': volt_nb,
             'lpm_min': mean_lpm_ratio,
@@ -776,6 +701,99 @@ def specs_completeness(specs,
             'data_number': data_number}
 
 
+def _curves_coeffs(specs, data_completeness, elec_archi, model):
+    """
+    Returns the coefficients of the modeling method 'model' fitted on the
+    specs. The fits only depend on the values of the specs, so they are
+    cached on them: a pump built again from the same data is not fitted
+    again. The warnings of the fit are raised again at each call, and the
+    coefficients are copied so that each pump owns its own.
+    """
+    try:
+        values = specs.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        # non numeric specs cannot be part of the cache key
+        return _fit_curves_coeffs(specs, data_completeness, elec_archi,
+                                  model)
+    coeffs, caught = _fit_curves_coeffs_cached(
+        values.tobytes(), values.shape, tuple(specs.columns),
+        tuple(sorted(data_completeness.items())), elec_archi, model)
+    for message in caught:
+        warnings.warn(message)
+    return {key: (value.copy() if isinstance(value, np.ndarray) else value)
+            for key, value in coeffs.items()}
+
+
+@functools.lru_cache(maxsize=128)
+def _fit_curves_coeffs_cached(values, shape, columns, data_completeness,
+                              elec_archi, model):
+    """
+    Cached version of _fit_curves_coeffs(), with hashable arguments. The
+    specs are rebuilt from the bytes of their values. Returns the
+    coefficients and the warnings raised by the fit.
+    """
+    specs = pd.DataFrame(np.frombuffer(values).reshape(shape),
+                         columns=list(columns))
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        coeffs = _fit_curves_coeffs(specs, dict(data_completeness),
+                                    elec_archi, model)
+    return coeffs, tuple(w.message for w in caught)
+
+
+def _fit_curves_coeffs(specs, data_completeness, elec_archi, model):
+    """
+    Fits the modeling method 'model' on the specs, see the functions
+    _curves_coeffs_*().
+    """
+    try:
+        builder, force_model = _curves_coeffs_builders[model.lower()]
+    except KeyError:
+        raise NotImplementedError(
+            "The requested modeling method is not available. Check your "
+            "spelling, or choose between the following: {0}".format(
+                'kou', 'arab', 'hamidat', 'theoretical'))  # noqa: F523
+    if force_model is None:
+        return builder(specs, data_completeness)
+    return builder(specs, data_completeness, elec_archi,
+                   force_model=force_model)
+
+
+def _coeffs_as_floats(coeffs):
+    """
+    Converts the fitted coefficients into a tuple of python floats.
+    The functIforVH_* functions evaluate the model directly on the V and H
+    given, typically scalars for one time step, where arithmetic on python
+    floats is several times faster than on numpy scalars. The functQforPH_*
+    models always get arrays from _functQ_in_domain, on which python
+    floats still avoid a numpy scalar per operation (about 20 % faster on
+    the polynomial models).
+    """
+    return tuple(np.asarray(coeffs, dtype=np.float64).tolist())
+
+
+def _flatten_specs(specs):
+    """
+    Extracts the numeric columns of specs as 1D contiguous float64 arrays,
+    so that the curve-fitting functions work on plain numpy data. The
+    arrays are views on specs when it comes from get_data_pump().
+
+    Parameters
+    ----------
+    specs: pandas.DataFrame
+        Dataframe with specifications of motor-pump
+
+    Returns
+    -------
+    dict
+        Arrays of the columns 'voltage', 'tdh', 'current', 'flow' and
+        'power' (when available).
+    """
+    return {col: np.ascontiguousarray(specs[col], dtype=np.float64)
+            for col in ('voltage', 'tdh', 'current', 'flow', 'power')
+            if col in specs.columns}
+
+
 # TODO: add way to use it with only very few data point in the case of mppt
 def _curves_coeffs_Arab06(specs, data_completeness):
     """
@@ -834,22 +852,23 @@ def _curves_coeffs_Arab06(specs, data_completeness):
         raise errors.InsufficientDataError('Lack of information on lpm, '
                                            'current or tdh for pump.')
 
+    data = _flatten_specs(specs)
     # f1: I(V, H)
-    dataxy = [np.array(specs.voltage),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.current)
+    dataxy = [data['voltage'],
+              data['tdh']]
+    dataz = data['current']
 
-    param_f1, covmat_f1 = opt.curve_fit(funct_mod_1, dataxy, dataz)
+    param_f1 = function_models.linear_fit(funct_mod_1, dataxy, dataz)
     # computing of statistical figures for f1
     stats_f1 = function_models.correlation_stats(funct_mod_1, param_f1,
                                                  dataxy, dataz)
 
     # f2: Q(P, H)
-    dataxy = [np.array(specs.power),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.flow)
+    dataxy = [data['power'],
+              data['tdh']]
+    dataz = data['flow']
 
-    param_f2, covmat_f2 = opt.curve_fit(funct_mod_2, dataxy, dataz)
+    param_f2 = function_models.linear_fit(funct_mod_2, dataxy, dataz)
     # computing of statistical figures for f2
     stats_f2 = function_models.correlation_stats(funct_mod_2, param_f2,
                                                  dataxy, dataz)
@@ -901,22 +920,23 @@ def _curves_coeffs_Kou98(specs, data_completeness):
         raise errors.InsufficientDataError('Lack of information on lpm, '
                                            'current or tdh for pump.')
 
+    data = _flatten_specs(specs)
     # f1: I(V, H)
-    dataxy = [np.array(specs.voltage),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.current)
+    dataxy = [data['voltage'],
+              data['tdh']]
+    dataz = data['current']
 
-    param_f1, covmat_f1 = opt.curve_fit(funct_mod, dataxy, dataz)
+    param_f1 = function_models.linear_fit(funct_mod, dataxy, dataz)
     # computing of statistical figures for f1
     stats_f1 = function_models.correlation_stats(funct_mod, param_f1,
                                                  dataxy, dataz)
 
     # f2: Q(P, H)
-    dataxy = [np.array(specs.power),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.flow)
+    dataxy = [data['power'],
+              data['tdh']]
+    dataz = data['flow']
 
-    param_f2, covmat_f2 = opt.curve_fit(funct_mod, dataxy, dataz)
+    param_f2 = function_models.linear_fit(funct_mod, dataxy, dataz)
     # computing of statistical figures for f2
     stats_f2 = function_models.correlation_stats(funct_mod, param_f2,
                                                  dataxy, dataz)
@@ -969,12 +989,13 @@ def _curves_coeffs_Hamidat08(specs, data_completeness):
         raise errors.InsufficientDataError('Lack of information on lpm, '
                                            'current or tdh for pump.')
 
+    data = _flatten_specs(specs)
     # f2: Q(P, H)
-    dataxy = [np.array(specs.flow),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.power)
+    dataxy = [data['flow'],
+              data['tdh']]
+    dataz = data['power']
 
-    param_f2, covmat_f2 = opt.curve_fit(funct_mod_2, dataxy, dataz)
+    param_f2 = function_models.linear_fit(funct_mod_2, dataxy, dataz)
     # computing of statistical figures for f2
     stats_f2 = function_models.correlation_stats(funct_mod_2, param_f2,
                                                  dataxy, dataz)
@@ -1126,14 +1147,15 @@ def _curves_coeffs_theoretical_variable_efficiency(
         """Returns the equation v(i, h).
         """
         i, h = input_values
-        funct_mod_beta = function_models.polynomial_2
-        beta = funct_mod_beta(h, beta_0, beta_1, beta_2)
+        beta = beta_0 + h*(beta_1 + h*beta_2)
         return R_a*i + beta*np.sqrt(i)
 
-    dataxy = [np.array(specs.current),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.voltage)
-    param_f1, matcov = opt.curve_fit(funct_mod_1, dataxy, dataz, maxfev=10000)
+    data = _flatten_specs(specs)
+    dataxy = [data['current'],
+              data['tdh']]
+    dataz = data['voltage']
+    # linear in its parameters
+    param_f1 = function_models.linear_fit(funct_mod_1, dataxy, dataz)
     # computing of statistical figures for f1
     stats_f1 = function_models.correlation_stats(funct_mod_1, param_f1,
                                                  dataxy, dataz)
@@ -1146,12 +1168,22 @@ def _curves_coeffs_theoretical_variable_efficiency(
         # but doesn't work with the curve fit:
         # return (a + b*H + c*H**2) * P/H
 
-    dataxy = [np.array(specs.power),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.flow)
+    def jac_mod_2(input_values, a, b, c, d):
+        """Returns the jacobian of funct_mod_2 relative to a, b, c, d.
+        """
+        P, H = input_values
+        fact_H = a + b*H
+        fact_P = c + d*P
+        return np.column_stack([fact_P, H*fact_P, fact_H, P*fact_H])
+
+    dataxy = [data['power'],
+              data['tdh']]
+    dataz = data['flow']
 
+    # the model is not linear in its parameters, but its jacobian is
+    # analytic, which avoids its estimation by finite differences
     param_f2, matcov = opt.curve_fit(funct_mod_2, dataxy, dataz,
-                                     maxfev=10000)
+                                     jac=jac_mod_2, maxfev=10000)
     # computing of statistical figures for f2
     stats_f2 = function_models.correlation_stats(funct_mod_2, param_f2,
                                                  dataxy, dataz)
@@ -1215,14 +1247,15 @@ def _curves_coeffs_theoretical_constant_efficiency(
         """Returns the equation v(i, h).
         """
         i, h = input_values
-        funct_mod_beta = function_models.polynomial_2
-        beta = funct_mod_beta(h, beta_0, beta_1, beta_2)
+        beta = beta_0 + h*(beta_1 + h*beta_2)
         return R_a*i + beta*np.sqrt(i)
 
-    dataxy = [np.array(specs.current),
-              np.array(specs.tdh)]
-    dataz = np.array(specs.voltage)
-    param_f1, matcov = opt.curve_fit(funct_mod_1, dataxy, dataz, maxfev=10000)
+    data = _flatten_specs(specs)
+    dataxy = [data['current'],
+              data['tdh']]
+    dataz = data['voltage']
+    # linear in its parameters
+    param_f1 = function_models.linear_fit(funct_mod_1, dataxy, dataz)
     # computing of statistical figures for f1
     stats_f1 = function_models.correlation_stats(funct_mod_1, param_f1,
                                                  dataxy, dataz)
@@ -1287,7 +1320,7 @@ def _curves_coeffs_theoretical_basic(specs, data_completeness, elec_archi):
     # NOTE: the value '0.7' in the following line is arbitrary. It was
     # found to be a value which minimizes the mean relative error
     # on the whole tdh range, but could be studied deeper.
-    param_f2 = [0.7 * specs.efficiency.max()]
+    param_f2 = np.array([0.7 * np.nanmax(specs.efficiency.to_numpy())])
 
     def funct_Q_for_PH(input_values, efficiency):
         P, H = input_values
@@ -1297,11 +1330,13 @@ def _curves_coeffs_theoretical_basic(specs, data_completeness, elec_archi):
         warnings.warn('Simplistic model of constant efficiency applied.')
         # TODO: remove the extreme points of the domain as here, because
         # efficiencies are nearly nil at these points
-        dataxy = [np.array(specs.power[specs.tdh > 7]),
-                  np.array(specs.tdh[specs.tdh > 7])]
-        dataz = np.array(specs.flow[specs.tdh > 7])
+        data = _flatten_specs(specs)
+        mask = data['tdh'] > 7
+        dataxy = [data['power'][mask],
+                  data['tdh'][mask]]
+        dataz = data['flow'][mask]
 
-        param_f2, covmat_f2 = opt.curve_fit(funct_Q_for_PH, dataxy, dataz)
+        param_f2 = function_models.linear_fit(funct_Q_for_PH, dataxy, dataz)
         # computing of statistical figures for f2
         stats_f2 = function_models.correlation_stats(funct_Q_for_PH, param_f2,
                                                      dataxy, dataz)
@@ -1320,6 +1355,151 @@ def _curves_coeffs_theoretical_basic(specs, data_completeness, elec_archi):
             'adjusted_r_squared_f2': stats_f2['adjusted_r_squared']}
 
 
+# fitting function of each modeling method, and 'force_model' given to
+# _curves_coeffs_theoretical()
+_curves_coeffs_builders = {
+    'kou': (_curves_coeffs_Kou98, None),
+    'arab': (_curves_coeffs_Arab06, None),
+    'hamidat': (_curves_coeffs_Hamidat08, None),
+    'theoretical': (_curves_coeffs_theoretical, 'flexible'),
+    'theoretical_cst_efficiency': (_curves_coeffs_theoretical,
+                                   'constant_efficiency'),
+    'theoretical_basic': (_curves_coeffs_theoretical, 'basic'),
+    'theoretical_var_efficiency': (_curves_coeffs_theoretical,
+                                   'variable_efficiency')}
+
+
+def _check_VH_in_domain(V, H, intervals):
+    """
+    Raises a HeadError or a VoltageError if V or H are out of the domain
+    of validity given by 'intervals' (typically coming from _domain_V_H).
+    V and H can be numeric or array-like.
+    """
+    V = np.asarray(V)
+    H = np.asarray(H)
+    # check if the head is available for the pump
+    v_max = intervals['V'](0)[1]
+    h_interval = intervals['H'](v_max)
+    if not np.all((0 <= H) & (H <= h_interval[1])):
+        raise errors.HeadError(
+                'H (={0}) is out of bounds for this pump. '
+                'H should be in the interval {1}.'
+                .format(H, h_interval))
+    # check if there is enough current for given head, with the interval
+    # on V evaluated once for all the values of H
+    v_bounds = np.broadcast_arrays(*intervals['V'](H))
+    if not np.all((v_bounds[0] <= V) & (V <= v_bounds[1])):
+        raise errors.VoltageError(
+                'V (={0}) is out of bounds. For this specific '
+                'head H (={1}), V should be in the interval {2}'
+                .format(V, H, np.array(v_bounds).tolist()))
+
+
+def _functQ_in_domain(funct, intervals, head_limit=True):
+    """
+    Builds the function giving the flow rate Q and the unused power
+    P_unused according to power P and head H, from the model
+    Q = funct(P, H) of the pump and from its domain of validity
+    'intervals' (typically coming from _domain_P_H).
+
+    The function returned accepts P and H numeric or array-like. The
+    working regimes of the pump are selected with masks:
+        - if P is lower than the minimum power for H, or if H is higher
+          than the maximum head for P (only if 'head_limit' is True),
+          there is no flow and all the power is unused,
+        - if P is higher than the maximum power for H, the pump works at
+          this maximum power, and the remaining power is unused,
+        - otherwise, all the power is used for pumping.
+    The flow rate is never negative (case where the extrapolation from
+    the curve fit is bad), and is NaN where P or H is NaN. Note that the
+    negative flow rates are clipped for every model and regime, whereas
+    formerly the Kou and Hamidat models only clipped them above the
+    maximum power, and the Arab and theoretical models only below it.
+    """
+    def functQ(P, H):
+        scalar = np.ndim(P) == 0 and np.ndim(H) == 0
+        P, H = np.broadcast_arrays(np.atleast_1d(np.asarray(P, np.float64)),
+                                   np.atleast_1d(np.asarray(H, np.float64)))
+        P_min, P_max = intervals['P'](H)
+        no_flow = P < P_min
+        if head_limit:
+            no_flow |= H > intervals['H'](P)[1]
+        P_used = np.minimum(P, P_max)
+        P_unused = np.where(no_flow, P, np.maximum(P - P_max, 0))
+        Q = np.where(no_flow, 0., np.nan)
+        # the model is only evaluated where needed (and defined)
+        pumping = ~no_flow & ~np.isnan(P_used)
+        if pumping.any():
+            Q[pumping] = np.maximum(funct(P_used[pumping], H[pumping]), 0)
+
+        if scalar:
+            return {'Q': float(Q[0]), 'P_unused': float(P_unused[0])}
+        return {'Q': Q, 'P_unused': P_unused}
+
+    return functQ
+
+
+def _secant_roots(func, x0, tol=1.48e-8, maxiter=50):
+    """
+    Finds the roots of the elementwise function func, starting from the
+    array x0, with the secant method of scipy.optimize.newton (without
+    fprime) applied to all the elements at once. Each element follows
+    the same iterates as with scipy, so that the same root is found
+    when func has several, which the array version of
+    scipy.optimize.newton does not ensure. The elements already converged
+    keep being iterated until all are, their result being stored when
+    they converge.
+
+    Raises a RuntimeError if an element does not converge, as scipy does.
+    """
+    eps = 1e-4
+    p0 = np.asarray(x0, dtype=np.float64)
+    p1 = p0 * (1 + eps)
+    p1 += np.where(p1 >= 0, eps, -eps)
+    q0 = func(p0)
+    q1 = func(p1)
+    swap = np.abs(q1) < np.abs(q0)
+    p0, p1 = np.where(swap, p1, p0), np.where(swap, p0, p1)
+    q0, q1 = np.where(swap, q1, q0), np.where(swap, q0, q1)
+
+    root = np.full(p0.shape, np.nan)
+    done = np.zeros(p0.shape, dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for itr in range(maxiter):
+            flat = ~done & (q1 == q0)
+            if (flat & (p1 != p0)).any():
+                raise RuntimeError('Tolerance reached. Failed to converge '
+                                   'after {0} iterations.'.format(itr + 1))
+            root[flat] = ((p1 + p0) / 2.0)[flat]
+            done |= flat
+            p = np.where(np.abs(q1) > np.abs(q0),
+                         (-q0 / q1 * p1 + p0) / (1 - q0 / q1),
+                         (-q1 / q0 * p0 + p1) / (1 - q1 / q0))
+            converged = ~done & np.isclose(p, p1, rtol=0, atol=tol)
+            root[converged] = p[converged]
+            done |= converged
+            if done.all():
+                return root
+            p0, q0 = p1, q1
+            p1 = p
+            q1 = func(p1)
+    raise RuntimeError('Failed to converge after {0} iterations.'.format(
+        maxiter))
+
+
+def _VH_domain_mask(V, H, intervals):
+    """
+    Returns a boolean array, True where (V, H) is in the domain of
+    validity given by 'intervals' (typically coming from _domain_V_H).
+    V and H can be numeric or array-like.
+    """
+    V = np.asarray(V, dtype=np.float64)
+    H = np.asarray(H, dtype=np.float64)
+    h_max = intervals['H'](intervals['V'](0)[1])[1]
+    v_min, v_max = intervals['V'](H)
+    return (0 <= H) & (H <= h_max) & (v_min <= V) & (V <= v_max)
+
+
 def _domain_V_H(specs, data_completeness):
     """
     Function giving the range of voltage and head in which the pump will
@@ -1338,42 +1518,45 @@ def _domain_V_H(specs, data_completeness):
     tuple
         Two lists, the domains on voltage V [V] and on head [m]
     """
-    funct_mod = function_models.polynomial_2
-
-    data_v = specs.voltage.drop_duplicates()
-    tdh_tips = []
-    for v in data_v:
-        tdh_tips.append(max(specs[specs.voltage == v].tdh))
+    # maximum head of each voltage, in one pass over the specs
+    tdh_by_voltage = specs.groupby('voltage', sort=False).tdh.max()
+    data_v = tdh_by_voltage.index.to_numpy()
+    tdh_tips = tdh_by_voltage.to_numpy()
+    # bounds of the data computed once, not at each call of the intervals
+    v_min = float(data_v.min())
+    v_max = float(data_v.max())
+    tdh_max = float(specs.tdh.max())
 
     if data_completeness['voltage_number'] > 2 \
             and data_completeness['lpm_min'] == 0:
         # case working fine for SunPumps - not sure about complete data from
         # other manufacturer
-        param_tdh, pcov_tdh = opt.curve_fit(funct_mod,
-                                            data_v, tdh_tips)
-        param_v, pcov_v = opt.curve_fit(funct_mod,
-                                        tdh_tips, data_v)
+        # linear least-squares fit, coeffs in increasing order of degree,
+        # unpacked as python floats. The intervals accept numeric or
+        # array-like arguments.
+        t0, t1, t2 = np.polynomial.polynomial.polyfit(
+            data_v, tdh_tips, 2).tolist()
+        v0, v1, v2 = np.polynomial.polynomial.polyfit(
+            tdh_tips, data_v, 2).tolist()
 
         def interval_vol(tdh):
             "Interval on v depending on tdh"
-            return [max(funct_mod(tdh, *param_v), min(data_v)),
-                    max(data_v)]
+            return [np.maximum(v0 + tdh*(v1 + tdh*v2), v_min), v_max]
 
         def interval_tdh(v):
             "Interval on tdh depending on v"
-            return [0, min(max(funct_mod(v, *param_tdh), 0),
-                           max(specs.tdh))]
+            return [0, np.clip(t0 + v*(t1 + v*t2), 0, tdh_max)]
 
     else:
         # Would need deeper work to fully understand what are the limits
         # on I and V depending on tdh, and how it affects lpm
         def interval_vol(*args):
             "Interval on vol, independent of tdh"
-            return [min(data_v), max(data_v)]
+            return [v_min, v_max]
 
         def interval_tdh(*args):
             "Interval on tdh, independent of vol"
-            return [0, max(specs.tdh)]
+            return [0, tdh_max]
 
     return interval_vol, interval_tdh
 
@@ -1397,76 +1580,94 @@ def _domain_P_H(specs, data_completeness):
         Two lists, the domains on power P [W] and on head [m]
 
     """
-    funct_mod = function_models.polynomial_1
+    def power_max_for_tdh(tdh):
+        """Maximum power of the specs at a head lower than tdh. tdh can
+        be numeric or array-like, but not lower than the smallest head of
+        the specs."""
+        tdh = np.asarray(tdh, dtype=np.float64)
+        # number of specs heads lower or equal to tdh, minus one
+        idx = np.searchsorted(sorted_tdh, tdh, side='right') - 1
+        if (idx[~np.isnan(tdh)] < 0).any():
+            raise ValueError('tdh (={0}) is lower than all the heads of '
+                             'the specs.'.format(np.nanmin(tdh)))
+        return np.where(np.isnan(tdh), np.nan,
+                        cummax_power[np.maximum(idx, 0)])
+
+    # the columns are extracted once, all the reductions below are done
+    # on the numpy arrays
+    tdh_ar = specs.tdh.to_numpy()
+    power_ar = specs.power.to_numpy()
+
+    # the maximum power below a head is a running maximum over the specs
+    # sorted by head, computed once and then searched at each call
+    order = np.argsort(tdh_ar, kind='stable')
+    sorted_tdh = tdh_ar[order]
+    cummax_power = np.maximum.accumulate(power_ar[order])
 
     if data_completeness['voltage_number'] >= 2 \
             and data_completeness['lpm_min'] == 0:
         # case working fine for SunPumps - not sure about complete data from
         # other manufacturer
-        df_flow_null = specs[specs.flow == 0]
-
-        datapower_df = df_flow_null['power']
-        datatdh_df = df_flow_null['tdh']
-
-        datapower_ar = np.array(datapower_df)
-        datatdh_ar = np.array(datatdh_df)
-
-        param_tdh, pcov_tdh = opt.curve_fit(funct_mod,
-                                            datapower_ar, datatdh_ar)
-        param_pow, pcov_pow = opt.curve_fit(funct_mod,
-                                            datatdh_ar, datapower_ar)
+        flow_null = specs.flow.to_numpy() == 0
+        datapower_ar = power_ar[flow_null]
+        datatdh_ar = tdh_ar[flow_null]
+
+        # linear least-squares fit, coeffs in increasing order of degree
+        t0, t1 = np.polynomial.polynomial.polyfit(datapower_ar,
+                                                  datatdh_ar, 1).tolist()
+        p0, p1 = np.polynomial.polynomial.polyfit(datatdh_ar,
+                                                  datapower_ar, 1).tolist()
+        power_min = float(datapower_ar.min())
+        tdh_max = float(datatdh_ar.max())
 
         def interval_power(tdh):
             "Interval on power depending on tdh"
-            power_max_for_tdh = max(specs[specs.tdh <= tdh].power)
-            return [max(funct_mod(tdh, *param_pow), min(datapower_ar)),
-                    power_max_for_tdh]
+            return [np.maximum(p0 + p1*tdh, power_min),
+                    power_max_for_tdh(tdh)]
 
         def interval_tdh(power):
             "Interval on tdh depending on v"
-            return [0, min(max(funct_mod(power, *param_tdh), 0),
-                           max(datatdh_ar))]
+            return [0, np.clip(t0 + t1*power, 0, tdh_max)]
 
     elif data_completeness['voltage_number'] >= 2:
-        tdhmax_df = specs[specs.tdh == max(specs.tdh)]
-        power_min_tdhmax = min(tdhmax_df.power)
-        tdhmin_df = specs[specs.tdh == min(specs.tdh)]
-        power_min_tdhmin = min(tdhmin_df.power)
-
-        datapower_ar = np.array([power_min_tdhmin, power_min_tdhmax])
-        datatdh_ar = np.array(
-            [float(specs[specs.power == power_min_tdhmin].tdh),
-             float(specs[specs.power == power_min_tdhmax].tdh)])
-        param_tdh, pcov_tdh = opt.curve_fit(funct_mod,
-                                            datapower_ar, datatdh_ar)
-        param_pow, pcov_pow = opt.curve_fit(funct_mod,
-                                            datatdh_ar, datapower_ar)
+        # minimum power at the lowest and at the highest head
+        tdh_min = tdh_ar.min()
+        tdh_max = tdh_ar.max()
+        datapower_ar = np.array([power_ar[tdh_ar == tdh_min].min(),
+                                 power_ar[tdh_ar == tdh_max].min()])
+        datatdh_ar = np.array([tdh_min, tdh_max])
+        # linear least-squares fit, coeffs in increasing order of degree
+        t0, t1 = np.polynomial.polynomial.polyfit(datapower_ar,
+                                                  datatdh_ar, 1).tolist()
+        p0, p1 = np.polynomial.polynomial.polyfit(datatdh_ar,
+                                                  datapower_ar, 1).tolist()
+        power_min = float(datapower_ar.min())
+        tdh_max = float(datatdh_ar.max())
 
         def interval_power(tdh):
             "Interval on power depending on tdh"
-            power_max_for_tdh = max(specs[specs.tdh <= tdh].power)
-            return [max(funct_mod(tdh, *param_pow), min(datapower_ar)),
-                    power_max_for_tdh]
+            return [np.maximum(p0 + p1*tdh, power_min),
+                    power_max_for_tdh(tdh)]
 
         def interval_tdh(power):
             "Interval on tdh depending on v"
-            return [0, min(max(funct_mod(power, *param_tdh), 0),
-                           max(datatdh_ar))]
+            return [0, np.clip(t0 + t1*power, 0, tdh_max)]
 
     else:
         # Would need deeper work to fully understand what are the limits
         # on I and V depending on tdh, and how it affects lpm
         # -> relates to function starting characteristics
-        datax_ar = np.array(specs.power)
-        datay_ar = np.array(specs.tdh)
+        power_min = float(np.nanmin(power_ar))
+        power_max = float(np.nanmax(power_ar))
+        tdh_max = float(np.nanmax(tdh_ar))
 
         def interval_power(*args):
             "Interval on power, independent of tdh"
-            return [min(datax_ar), max(datax_ar)]
+            return [power_min, power_max]
 
         def interval_tdh(*args):
             "Interval on tdh, independent of power"
-            return [0, max(datay_ar)]
+            return [0, tdh_max]
 
     return interval_power, interval_tdh
 
@@ -1497,11 +1698,12 @@ def _extrapolate_pow_eff_with_cst_efficiency(specs, efficiency_coeff=1):
         Attribute specs of Pump().
     """
     # computes all the hydraulic power through tdh and Q
-    hydrau_power = specs.flow/60000 * specs.tdh * 9810
+    hydrau_power = _hydraulic_power(specs)
     # keep the data where hydraulic power is the highest, and
     # assumes that this is the rated flowrate point
-    rated_data = specs[hydrau_power == hydrau_power.max()]
-    rated_power = rated_data.voltage * rated_data.current
+    voltage = specs.voltage.to_numpy()
+    rated = hydrau_power == hydrau_power.max()
+    rated_power = voltage[rated] * specs.current.to_numpy()[rated]
     rated_efficiency = float(hydrau_power.max()/rated_power)
     # check consistency:
     if not 0 < rated_efficiency < 1:
@@ -1513,85 +1715,140 @@ def _extrapolate_pow_eff_with_cst_efficiency(specs, efficiency_coeff=1):
     specs['efficiency'] = mean_efficiency
     warnings.warn('Power and current data will be recomputed '
                   'with constant efficiency assumption.')
-    specs.power = hydrau_power / mean_efficiency
-    specs.current = specs.power / specs.voltage
+    # computed in place in the array of hydraulic power, not used anymore
+    power = np.divide(hydrau_power, mean_efficiency, out=hydrau_power)
+    specs['power'] = power
+    specs['current'] = power / voltage
     return specs
 
 
-def plot_Q_vs_P_H_3d(pump):
+def _hydraulic_power(specs):
+    """
+    Returns the hydraulic power [W] of each row of specs as a new numpy
+    array, computed in place from the flow [L/min] and tdh [m] columns.
+    """
+    hydrau_power = specs.flow.to_numpy() / 60000
+    hydrau_power *= specs.tdh.to_numpy()
+    hydrau_power *= 9810
+    return hydrau_power
+
+
+def plot_Q_vs_P_H_3d(pump, ax=None):
     """
     Print the graph of Q [L/min] vs tdh [m] and P [W] in 3 dimensions.
 
+    Parameters
+    ----------
+    pump: pvpumpingsystem.pump.Pump
+        The pump to plot.
+
+    ax: mpl_toolkits.mplot3d.Axes3D, default is None
+        Axes in which the graph is drawn, after being cleared. Allows to
+        reuse a figure. If None, a new figure is created and shown.
+
     Returns
     -------
     Graph Q (H, P): matplotlib.figure
 
     """
 
-    f2, intervals = pump.functQforPH()
-    lpm_check = []
+    import matplotlib.pyplot as plt
 
-    for index, row in pump.specs.iterrows():
-        try:
-            Q = f2(row.power, row.tdh)
-        except (errors.PowerError, errors.HeadError):
-            Q = 0
-        lpm_check.append(Q['Q'])
-    fig = plt.figure()
-    ax = fig.add_subplot(
-            111, projection='3d', title=(
-                    'Flow Q depending on P and H\nmodeling_method: '
-                    + str(pump.modeling_method)))
-    ax.scatter(pump.specs.power, pump.specs.tdh,
-               pump.specs.flow,
-               label='from data')
-    ax.scatter(pump.specs.power, pump.specs.tdh,
-               lpm_check,
-               label='from curve fitting with modeling method {0}'.format(
-                       pump.modeling_method))
-    ax.set_xlabel('power')
-    ax.set_ylabel('head')
-    ax.set_zlabel('discharge Q')
-    ax.legend(loc='lower left')
-    plt.show()
-
-
-def plot_I_vs_V_H_3d(pump):
+    f2, intervals = pump.functQforPH()
+    data = _flatten_specs(pump.specs)
+    # f2 accepts arrays, the whole specs are evaluated in one call
+    lpm_check = f2(data['power'], data['tdh'])['Q']
+    new_figure = ax is None
+    ax = _axes_3d(ax)
+    _scatter_data_and_model(ax, data['power'], data['tdh'],
+                            data['flow'], lpm_check,
+                            pump.modeling_method)
+    ax.set(title=('Flow Q depending on P and H\nmodeling_method: '
+                  + str(pump.modeling_method)),
+           xlabel='power', ylabel='head', zlabel='discharge Q')
+    if new_figure:
+        plt.show()
+
+
+def plot_I_vs_V_H_3d(pump, ax=None):
     """
     Print the graph of I [A] vs tdh [m] and V [V] in 3 dimensions.
 
+    Parameters
+    ----------
+    pump: pvpumpingsystem.pump.Pump
+        The pump to plot.
+
+    ax: mpl_toolkits.mplot3d.Axes3D, default is None
+        Axes in which the graph is drawn, after being cleared. Allows to
+        reuse a figure. If None, a new figure is created and shown.
+
     Returns
     -------
     Graph I (V, H): matplotlib.figure
 
     """
 
+    import matplotlib.pyplot as plt
+
     f1, intervals = pump.functIforVH()
-    intensity_check = []
+    data = _flatten_specs(pump.specs)
+    voltage = data['voltage']
+    tdh = data['tdh']
+    # f1 is evaluated on all the points at once. The points out of the
+    # domain of the model are set to 0.
+    valid = _VH_domain_mask(voltage, tdh, intervals)
+    intensity_check = np.zeros(len(voltage))
+    intensity_check[valid] = f1(voltage[valid], tdh[valid],
+                                error_raising=False)
+    new_figure = ax is None
+    ax = _axes_3d(ax)
+    _scatter_data_and_model(ax, voltage, tdh,
+                            data['current'], intensity_check,
+                            pump.modeling_method)
+    ax.set(title=('Current I depending on V and H\nmodeling_method: '
+                  + str(pump.modeling_method)),
+           xlabel='voltage', ylabel='head', zlabel='current I')
+    if new_figure:
+        plt.show()
+
+
+def _axes_3d(ax=None):
+    """
+    Returns the 3d axes 'ax' cleared, or the 3d axes of a new figure if
+    ax is None.
+    """
+    import matplotlib.pyplot as plt
+    # following line needed for plotting in 3d:
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
 
-    for index, row in pump.specs.iterrows():
-        try:
-            intensity = f1(row.voltage, row.tdh)
-        except (errors.VoltageError, errors.HeadError):
-            intensity = 0
-        intensity_check.append(intensity)
-    fig = plt.figure()
-    ax = fig.add_subplot(
-            111, projection='3d', title=(
-                    'Current I depending on V and H\nmodeling_method: '
-                    + str(pump.modeling_method)))
-    ax.scatter(pump.specs.voltage, pump.specs.tdh,
-               pump.specs.current,
-               label='from data')
-    ax.scatter(pump.specs.voltage, pump.specs.tdh,
-               intensity_check,
-               label='from curve fitting with modeling method {0}'.format(
-                       pump.modeling_method))
-    ax.set_xlabel('voltage')
-    ax.set_ylabel('head')
-    ax.set_zlabel('current I')
-    ax.legend(loc='lower left')
-    plt.show()
+    if ax is None:
+        ax = plt.figure().add_subplot(111, projection='3d')
+    else:
+        ax.cla()
+    return ax
+
+
+def _scatter_data_and_model(ax, x, y, z_data, z_model, modeling_method):
+    """
+    Scatters on the 3d axes 'ax' the data and the values computed with
+    the model, in one single collection of points colored by origin.
+    """
+    from matplotlib.lines import Line2D
+
+    nb_points = len(z_data)
+    ax.scatter(np.concatenate([x, x]), np.concatenate([y, y]),
+               np.concatenate([z_data, z_model]),
+               c=['C0'] * nb_points + ['C1'] * nb_points,
+               depthshade=False)
+    # legend built with proxy artists, as there is one collection only
+    labels = ['from data',
+              'from curve fitting with modeling method {0}'.format(
+                  modeling_method)]
+    ax.legend(handles=[Line2D([], [], linestyle='', marker='o',
+                              color=color, label=label)
+                       for color, label in zip(['C0', 'C1'], labels)],
+              loc='lower left')
 
 
 def plot_Q_vs_V_H_2d(pump):
@@ -1603,17 +1860,24 @@ def plot_Q_vs_V_H_2d(pump):
     Graph Q (H, V): matplotlib.figure
 
     """
+    import matplotlib.pyplot as plt
+
     # Get the model function
-    f2, intervals = pump.functQforVH()
-    # Loops for computing the data computed with the model
-    modeled_data = pd.DataFrame()
-    for V in pump.voltage_list:
-        tdh_max = pump.specs[pump.specs.voltage == V].tdh.max()
-        tdh_vect = np.linspace(0, tdh_max, num=10)  # vector of tdh
-        for H in tdh_vect:
-            modeled_data = modeled_data.append(
-                    {'voltage': V, 'tdh': H, 'flow': f2(V, H)['Q']},
-                    ignore_index=True)
+    functQ, _ = pump.functQforVH()
+    # specs of each voltage extracted once as numpy arrays (tdh, flow)
+    specs_by_voltage = {
+        V: (group.tdh.to_numpy(), group.flow.to_numpy())
+        for V, group in pump.specs.groupby('voltage', sort=False)}
+    # Computes the data with the model, on 10 heads by voltage: grid of
+    # one row by voltage, evaluated at once
+    voltages = pump.voltage_list
+    tdh_tips = np.array([specs_by_voltage[V][0].max() for V in voltages])
+    tdh_grid = tdh_tips[:, np.newaxis] * np.linspace(0, 1, num=10)
+    flow_grid = functQ(voltages[:, np.newaxis], tdh_grid)['Q']
+    modeled_data = {V: (tdh_grid[i], flow_grid[i])
+                    for i, V in enumerate(voltages)}
+    # the y limit is based on the highest voltage
+    tdh_max = tdh_tips[-1]
 
     # Plot
     plt.figure(facecolor='White')
@@ -1623,19 +1887,17 @@ def plot_Q_vs_V_H_2d(pump):
         # get the next color to have the same color by voltage:
         col = next(ax1._get_lines.prop_cycler)['color']
         # plot simulated data
-        plot(modeled_data[modeled_data.voltage == V].tdh,
-             modeled_data[modeled_data.voltage == V].flow,
-             linestyle='--',
-             linewidth=1.5,
-             color=col,
-             label=str(V)+'VDC extrapolated')
+        plt.plot(*modeled_data[V],
+                 linestyle='--',
+                 linewidth=1.5,
+                 color=col,
+                 label='{:g}VDC extrapolated'.format(V))
         # plot measured data
-        plot(pump.specs[pump.specs.voltage == V].tdh,
-             pump.specs[pump.specs.voltage == V].flow,
-             linestyle='-',
-             linewidth=2,
-             color=col,
-             label=str(V)+'VDC from specs')
+        plt.plot(*specs_by_voltage[V],
+                 linestyle='-',
+                 linewidth=2,
+                 color=col,
+                 label='{:g}VDC from specs'.format(V))
     # graph general appearance
     ax1.set_title('Flow rate curves Vs. Head\nmodeling_method: '
                   + str(pump.modeling_method))
@@ -5,6 +5,8 @@ Module for containing pvlib-python in a more convenient way.
 @author: tylunel
 """
 
+import functools
+import os
 import pvlib
 import difflib
 
@@ -232,8 +234,7 @@ class PVGeneration:
     @weather_data_and_metadata.setter
     def weather_data_and_metadata(self, value):
         if isinstance(value, str):  # assumed to be the path of weather
-            self.weather_data, metadata = pvlib.iotools.epw.read_epw(
-                    value, coerce_year=2005)
+            self.weather_data, metadata = read_epw_cached(value)
             self.location = pvlib.location.Location.from_epw(metadata)
         else:  # assumed to be dict with weather data (pd.df) and metadata
             self.weather_data = value['weather_data']
@@ -285,3 +286,38 @@ class PVGeneration:
         """
         # Running of the PV generation model
         self.modelchain.run_model(weather=self.weather_data)
+
+
+def read_epw_cached(path, coerce_year=2005):
+    """
+    Reads the epw weather file at 'path' with pvlib, and caches the parsed
+    data so that building several PVGeneration objects (typically during
+    a sizing) on the same file parses it only once.
+
+    Parameters
+    ----------
+    path: str
+        Path to the .epw file.
+
+    coerce_year: integer, default is 2005
+        Year to which the weather data is coerced.
+
+    Returns
+    -------
+    tuple
+        A copy of the weather data (pandas.DataFrame) and of the metadata
+        (dict), as returned by pvlib.iotools.epw.read_epw().
+    """
+    weather_data, metadata = _read_epw(os.path.abspath(path),
+                                       os.path.getmtime(path), coerce_year)
+    return weather_data.copy(), dict(metadata)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_epw(path, mtime, coerce_year):
+    """
+    Cached reading of epw file. 'mtime' is only part of the cache key, so
+    that a modified file is read again. The objects returned are shared
+    between calls and must not be modified, use read_epw_cached() instead.
+    """
+    return pvlib.iotools.epw.read_epw(path, coerce_year=coerce_year)
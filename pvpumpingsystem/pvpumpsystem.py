@@ -10,7 +10,6 @@ functions for computing main output (water discharge,...) from input
 import numpy as np
 import pandas as pd
 import scipy.optimize as opt
-import matplotlib.pyplot as plt
 import tqdm
 import time
 import pvlib
@@ -191,6 +190,9 @@ class PVPumpSystem(object):
                 tdh=tdh)
 
         if plot:
+            # imported here, so that matplotlib is only loaded for plots
+            import matplotlib.pyplot as plt
+
             plt.figure()
             # domain of interest on V
             # (*1.1 is for the case when conditions are better than stc)
@@ -355,7 +357,9 @@ class PVPumpSystem(object):
         # set reservoir with enough water to fulfil the need of one morning
         elif starting_soc == 'morning':
             # Get water needed in the first morning (until 12am)
-            vol = float((self.consumption.flow_rate.iloc[0:12]*60).sum())
+            vol = float(np.sum(
+                self.consumption.flow_rate.Qlpm.to_numpy()[0:12],
+                dtype=np.float64) * 60)
             # initialization of water in reservoir
             self.reservoir.water_volume = vol
 
@@ -408,7 +412,9 @@ class PVPumpSystem(object):
                 self.consumption.flow_rate,
                 self.flow.Qlpm)
 
-        total_water_required = sum(self.consumption.flow_rate.Qlpm*60)
+        # consumption is stored in float32, so accumulated in float64
+        total_water_required = float(np.sum(
+            self.consumption.flow_rate.Qlpm.to_numpy(), dtype=np.float64) * 60)
         total_water_lacking = -sum(self.water_stored.extra_water[
                 self.water_stored.extra_water < 0])
 
@@ -896,25 +902,36 @@ def calc_efficiency(df, irradiance, pv_area):
         Dataframe with efficiencies
 
     """
-    electric_power_in = df.P
+    # computed on numpy arrays, with constants folded: avoids the index
+    # alignment and the intermediate Series of each pandas operation.
+    # Inputs on different time steps (typically a flow computed with 'stop')
+    # are first aligned on the union of their indexes, as pandas does
+    if (isinstance(irradiance, (pd.Series, pd.DataFrame))
+            and not irradiance.index.equals(df.index)):
+        index = df.index.union(irradiance.index)
+        df = df.reindex(index)
+        irradiance = irradiance.reindex(index)
+    electric_power_in = df.P.values
+    irrad_power = np.asarray(irradiance, dtype=np.float64) * pv_area
 
     g = 9.804  # in m/s2
     density = 1000  # in kg/m3
-    hydraulic_power = df.tdh*g*density * df.Qlpm/(60*1000)
-
-    pump_efficiency = hydraulic_power/electric_power_in
-
-    irrad_power = irradiance * pv_area
+    hydraulic_power = np.multiply(df.tdh.values, df.Qlpm.values,
+                                  dtype=np.float64)
+    hydraulic_power *= g*density/(60*1000)
 
-    pv_efficiency = electric_power_in/irrad_power
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pump_efficiency = hydraulic_power/electric_power_in
+        pv_efficiency = electric_power_in/irrad_power
+        total_efficiency = pump_efficiency*pv_efficiency
 
-    return pd.concat({'electric_power': electric_power_in,
-                      'hydraulic_power': hydraulic_power,
-                      'irrad_power': irrad_power,
-                      'pump_efficiency': pump_efficiency,
-                      'pv_efficiency': pv_efficiency,
-                      'total_efficiency': pump_efficiency*pv_efficiency},
-                     axis=1)
+    return pd.DataFrame({'electric_power': electric_power_in,
+                         'hydraulic_power': hydraulic_power,
+                         'irrad_power': irrad_power,
+                         'pump_efficiency': pump_efficiency,
+                         'pv_efficiency': pv_efficiency,
+                         'total_efficiency': total_efficiency},
+                        index=df.index)
 
 
 def calc_reservoir(reservoir, Q_pumped, Q_consumption):
@@ -939,7 +956,6 @@ def calc_reservoir(reservoir, Q_pumped, Q_consumption):
         Dataframe with water_volume in tank, and extra or lacking water.
     """
 
-    level = []
     # timestep of flowrate dataframe Q_lpm_df
     timestep = Q_pumped.index[1] - Q_pumped.index[0]
     timestep_minute = timestep.seconds/60
@@ -955,10 +971,10 @@ def calc_reservoir(reservoir, Q_pumped, Q_consumption):
     # total change in volume during the timestep in liters
     volume_diff = Q_diff * timestep_minute
 
-    for vol in volume_diff:
-        level.append(reservoir.change_water_volume(vol))
+    volume, extra_water = reservoir.change_water_volume_series(volume_diff)
 
-    water_stored = pd.DataFrame(level, columns=('volume', 'extra_water'))
-    water_stored.index = Q_pumped.index
+    water_stored = pd.DataFrame({'volume': volume,
+                                 'extra_water': extra_water},
+                                index=Q_pumped.index)
 
     return water_stored
@@ -70,3 +70,55 @@ class Reservoir(object):
             return (0, lacking_water)
 
         return (self.water_volume, 0)
+
+    def change_water_volume_series(self, quantities):
+        """Function for adding or removing successive quantities of water
+        in the reservoir, typically one per time step.
+
+        Parameters
+        ----------
+        quantities: 1D array-like
+            amounts of water to add or remove (in liters). NaN are
+            considered as 0.
+
+        Returns
+        -------
+        tuple
+            (water_volume, extra (+) or lacking water(-)), as two numpy
+            arrays with one value per quantity.
+        """
+        volume, extra_water, self.water_volume = _water_volume_kernel(
+            np.asarray(quantities, dtype=np.float64),
+            float(self.water_volume), float(self.size))
+        return (volume, extra_water)
+
+
+def _water_volume_kernel(quantities, water_volume, size):
+    """
+    Time-stepping kernel of the reservoir, on plain floats and numpy
+    arrays only. Same logic as Reservoir.change_water_volume applied
+    successively on each element of 'quantities'.
+    """
+    nb_steps = len(quantities)
+    extra_water = np.zeros(nb_steps)
+    quantities = np.where(np.isnan(quantities), 0, quantities)
+    if nb_steps == 0:
+        return np.empty(0), extra_water, water_volume
+
+    # if the reservoir never gets empty nor full, it is a simple running sum
+    volume = np.cumsum(np.concatenate(([water_volume], quantities)))[1:]
+    if volume.min() >= 0 and volume.max() <= size:
+        return volume, extra_water, volume[-1]
+
+    # loop on python floats, faster than on numpy scalars
+    for i, quantity in enumerate(quantities.tolist()):
+        water_volume += quantity
+        if water_volume > size:
+            extra_water[i] = water_volume - size
+            water_volume = size
+        elif water_volume < 0:
+            extra_water[i] = water_volume
+            water_volume = 0.
+        volume[i] = water_volume
+
+    return volume, extra_water, water_volume
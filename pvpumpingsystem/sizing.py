@@ -5,6 +5,7 @@ Module implementing sizing procedure to facilitate pv pumping station sizing.
 @author: Tanguy Lunel
 """
 
+import concurrent.futures
 import numpy as np
 import pandas as pd
 import tqdm
@@ -112,6 +113,7 @@ def subset_respecting_llp_direct(pv_database, pump_database,  # noqa: C901
                                  llp_accepted=0.01,
                                  M_s_guess=None,
                                  M_p_guess=None,
+                                 n_jobs=None,
                                  **kwargs):
     """
     Function returning the configurations of PV modules and pump
@@ -145,6 +147,15 @@ def subset_respecting_llp_direct(pv_database, pump_database,  # noqa: C901
         Estimated number of modules in series in the PV array. Will be sized
         by the function.
 
+    n_jobs: integer, default is None
+        Number of processes used to explore the pump database. None or 1
+        runs the exploration sequentially, -1 uses one process per CPU.
+        In parallel, pvps_fixture is modified in the sub-processes only,
+        and the warnings raised there are raised again once the exploration
+        of the pump database is over. On platforms starting the processes
+        with 'spawn' (Windows, macOS), the calling script must be protected
+        by an ``if __name__ == '__main__':`` block.
+
     Returns
     -------
     pandas.Dataframe
@@ -192,59 +203,11 @@ def subset_respecting_llp_direct(pv_database, pump_database,  # noqa: C901
             losses_model='no_loss'
             )
 
-        for pump in tqdm.tqdm(pump_database,
-                              desc='Pump database exploration: ',
-                              total=len(pump_database)):
-            # check that pump can theoretically work for given tdh
-            if pvps_fixture.pipes.h_stat > 0.9*pump.range.tdh['max']:
-                warnings.warn('Pump {0} does not match '
-                              'the required head'.format(pump.idname))
-                continue  # skip this round
-
-            # compute limits for number of modules in PV array
-            # M_p
-            I_sc_array_min = pump.range.current['min']
-            I_sc_array_max = pump.range.current['max'] * 4  # arbitrary coeff
-            M_p_max = (I_sc_array_max  # round down
-                       // pvps_fixture.pvgeneration.pv_module.I_sc_ref)
-            M_p_min = (I_sc_array_min  # round up
-                       // pvps_fixture.pvgeneration.pv_module.I_sc_ref) + 1
-            # M_s
-            V_oc_array_min = pump.range.voltage['min']
-            V_oc_array_max = pump.range.voltage['max'] * 1.2
-            M_s_min = (V_oc_array_min  # round up
-                       // pvps_fixture.pvgeneration.pv_module.V_oc_ref) + 1
-            M_s_max = (V_oc_array_max  # round up
-                       // pvps_fixture.pvgeneration.pv_module.V_oc_ref) + 1
-
-            # Check that the current pump is in the range
-            if pvps_fixture.pvgeneration.pv_module.V_oc_ref > V_oc_array_max:
-                warnings.warn(('Pump {0} and PV module voltage of {1} '
-                               'do not match').format(pump.idname,
-                                                      pv_mod_name))
-                continue  # skip this round
-            if pvps_fixture.pvgeneration.pv_module.I_sc_ref > I_sc_array_max:
-                warnings.warn(('Pump {0} and PV module current of {1} '
-                               'do not match').format(pump.idname,
-                                                      pv_mod_name))
-                continue  # skip this round
-
-            # If the range is ok, update the pump
-            pvps_fixture.motorpump = pump
-
-            M_s, M_p = size_nb_pv_direct(
-                    pvps_fixture, llp_accepted,
-                    M_s_min, M_s_max, M_p_min, M_p_max, **kwargs)
-
-            preselection = preselection.append(
-                pd.Series({
-                        'pv_module': pvps_fixture.pvgeneration.pv_module.name,
-                        'M_s': M_s,
-                        'M_p': M_p,
-                        'pump': pump.idname,
-                        'llp': pvps_fixture.llp,
-                        'npv': pvps_fixture.npv}),
-                ignore_index=True)
+        preselection = preselection.append(
+            _map_on_pumps(_size_pump_direct, pump_database, n_jobs,
+                          (pvps_fixture, pv_mod_name, llp_accepted, kwargs),
+                          progress_desc='Pump database exploration: '),
+            ignore_index=True)
 
     # Remove not satifying LLP
     preselection = preselection[preselection.llp <= llp_accepted]
@@ -252,6 +215,141 @@ def subset_respecting_llp_direct(pv_database, pump_database,  # noqa: C901
     return preselection
 
 
+def _map_on_pumps(worker, pump_database, n_jobs, args, progress_desc=None):
+    """
+    Applies worker(pump, *args) on each pump of pump_database, sequentially
+    if n_jobs is None or 1, or else in n_jobs processes (-1 meaning one
+    process per CPU). Returns the list of non-None results, in the order
+    of pump_database.
+
+    A progress bar is displayed in sequential mode if progress_desc is given.
+    In parallel mode, args are sent once to each process rather than once
+    per pump, and the warnings raised in the processes are raised again
+    in the main process.
+    The parallel mode uses a ProcessPoolExecutor, which requires the
+    calling script to be protected by ``if __name__ == '__main__':`` on
+    platforms starting the processes with 'spawn' (Windows, macOS).
+    """
+    if n_jobs is None or n_jobs == 1:
+        if progress_desc is not None:
+            pump_database = tqdm.tqdm(pump_database, desc=progress_desc,
+                                      total=len(pump_database))
+        results = [worker(pump, *args) for pump in pump_database]
+    else:
+        max_workers = None if n_jobs == -1 else n_jobs
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers, initializer=_init_pump_worker,
+                initargs=(worker, args)) as executor:
+            outputs = list(executor.map(_run_pump_worker, pump_database))
+        results = []
+        for res, caught in outputs:
+            for message, filename, lineno in caught:
+                warnings.warn_explicit(message, type(message),
+                                       filename, lineno)
+            results.append(res)
+    return [res for res in results if res is not None]
+
+
+# worker and arguments of _map_on_pumps, set once in each sub-process
+_pump_worker = None
+
+
+def _init_pump_worker(worker, args):
+    global _pump_worker
+    _pump_worker = (worker, args)
+
+
+def _run_pump_worker(pump):
+    """
+    Runs the worker of the sub-process on pump. Returns the result with
+    the warnings raised, as (message, filename, lineno) tuples.
+    """
+    worker, args = _pump_worker
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        res = worker(pump, *args)
+    return res, [(w.message, w.filename, w.lineno) for w in caught]
+
+
+def _size_pump_direct(pump, pvps_fixture, pv_mod_name, llp_accepted, kwargs):
+    """
+    Sizes the PV array of pvps_fixture with pump in direct coupling.
+    Returns the configuration found as a pandas.Series, or None if the pump
+    does not match the head or the PV module.
+    """
+    # check that pump can theoretically work for given tdh
+    if pvps_fixture.pipes.h_stat > 0.9*pump.range.tdh['max']:
+        warnings.warn('Pump {0} does not match '
+                      'the required head'.format(pump.idname))
+        return None
+
+    # compute limits for number of modules in PV array
+    # M_p
+    I_sc_array_min = pump.range.current['min']
+    I_sc_array_max = pump.range.current['max'] * 4  # arbitrary coeff
+    M_p_max = (I_sc_array_max  # round down
+               // pvps_fixture.pvgeneration.pv_module.I_sc_ref)
+    M_p_min = (I_sc_array_min  # round up
+               // pvps_fixture.pvgeneration.pv_module.I_sc_ref) + 1
+    # M_s
+    V_oc_array_min = pump.range.voltage['min']
+    V_oc_array_max = pump.range.voltage['max'] * 1.2
+    M_s_min = (V_oc_array_min  # round up
+               // pvps_fixture.pvgeneration.pv_module.V_oc_ref) + 1
+    M_s_max = (V_oc_array_max  # round up
+               // pvps_fixture.pvgeneration.pv_module.V_oc_ref) + 1
+
+    # Check that the current pump is in the range
+    if pvps_fixture.pvgeneration.pv_module.V_oc_ref > V_oc_array_max:
+        warnings.warn(('Pump {0} and PV module voltage of {1} '
+                       'do not match').format(pump.idname, pv_mod_name))
+        return None
+    if pvps_fixture.pvgeneration.pv_module.I_sc_ref > I_sc_array_max:
+        warnings.warn(('Pump {0} and PV module current of {1} '
+                       'do not match').format(pump.idname, pv_mod_name))
+        return None
+
+    # If the range is ok, update the pump
+    pvps_fixture.motorpump = pump
+
+    M_s, M_p = size_nb_pv_direct(
+            pvps_fixture, llp_accepted,
+            M_s_min, M_s_max, M_p_min, M_p_max, **kwargs)
+
+    return pd.Series({'pv_module': pvps_fixture.pvgeneration.pv_module.name,
+                      'M_s': M_s,
+                      'M_p': M_p,
+                      'pump': pump.idname,
+                      'llp': pvps_fixture.llp,
+                      'npv': pvps_fixture.npv})
+
+
+def _size_pump_mppt(pump, pvps_fixture, llp_accepted, M_s_guess, kwargs):
+    """
+    Sizes the PV array of pvps_fixture with pump in mppt coupling.
+    Returns the configuration found as a pandas.Series, or None if the pump
+    does not match the head.
+    """
+    # check that pump can theoretically match
+    if pvps_fixture.pipes.h_stat > 0.9*pump.range.tdh['max']:
+        warnings.warn('Pump {0} does not match '
+                      'the required head'.format(pump.idname))
+        return None
+
+    # Sets the motorpump
+    pvps_fixture.motorpump = pump
+
+    # Sizes the PV generator for respecting the llp_accepted
+    M_s = size_nb_pv_mppt(pvps_fixture, llp_accepted, M_s_guess, **kwargs)
+
+    return pd.Series({'pv_module': pvps_fixture.pvgeneration.pv_module.name,
+                      'M_s': M_s,
+                      'M_p': 1,
+                      'pump': pump.idname,
+                      'llp': pvps_fixture.llp,
+                      'npv': pvps_fixture.npv})
+
+
 def size_nb_pv_direct(pvps_fixture, llp_accepted,    # noqa: C901
                       M_s_min, M_s_max, M_p_min, M_p_max,
                       M_s_guess=None, M_p_guess=None,
@@ -346,6 +444,7 @@ def subset_respecting_llp_mppt(pv_database, pump_database,    # noqa: C901
                                pvps_fixture,
                                llp_accepted=0.01,
                                M_s_guess=None,
+                               n_jobs=None,
                                **kwargs):
     """
     Function returning the configurations of PV modules and pump
@@ -379,6 +478,15 @@ def subset_respecting_llp_mppt(pv_database, pump_database,    # noqa: C901
         Estimated number of modules in series in the PV array. Will be sized
         by the function.
 
+    n_jobs: integer, default is None
+        Number of processes used to explore the pump database. None or 1
+        runs the exploration sequentially, -1 uses one process per CPU.
+        In parallel, pvps_fixture is modified in the sub-processes only,
+        and the warnings raised there are raised again once the exploration
+        of the pump database is over. On platforms starting the processes
+        with 'spawn' (Windows, macOS), the calling script must be protected
+        by an ``if __name__ == '__main__':`` block.
+
     Returns
     -------
     pandas.Dataframe,
@@ -425,29 +533,10 @@ def subset_respecting_llp_mppt(pv_database, pump_database,    # noqa: C901
             losses_model='no_loss'
             )
 
-        for pump in pump_database:
-            # check that pump can theoretically match
-            if pvps_fixture.pipes.h_stat > 0.9*pump.range.tdh['max']:
-                warnings.warn('Pump {0} does not match '
-                              'the required head'.format(pump.idname))
-                continue  # skip this round
-
-            # Sets the motorpump
-            pvps_fixture.motorpump = pump
-
-            # Sizes the PV generator for respecting the llp_accepted
-            M_s = size_nb_pv_mppt(pvps_fixture, llp_accepted, M_s_guess,
-                                  **kwargs)
-
-            preselection = preselection.append(
-                pd.Series({
-                    'pv_module': pvps_fixture.pvgeneration.pv_module.name,
-                    'M_s': M_s,
-                    'M_p': 1,
-                    'pump': pump.idname,
-                    'llp': pvps_fixture.llp,
-                    'npv': pvps_fixture.npv}),
-                ignore_index=True)
+        preselection = preselection.append(
+            _map_on_pumps(_size_pump_mppt, pump_database, n_jobs,
+                          (pvps_fixture, llp_accepted, M_s_guess, kwargs)),
+            ignore_index=True)
 
     # Remove not satifying LLP
     preselection = preselection[preselection.llp <= llp_accepted]
@@ -527,6 +616,7 @@ def sizing_minimize_npv(pv_database, pump_database,
                         llp_accepted=0.01,
                         M_s_guess=None,
                         M_p_guess=None,
+                        n_jobs=None,
                         **kwargs):
     """
     Function returning the configuration of PV modules and pump
@@ -567,6 +657,15 @@ def sizing_minimize_npv(pv_database, pump_database,
         Estimated number of modules in series in the PV array. Will be sized
         by the function.
 
+    n_jobs: integer, default is None
+        Number of processes used to explore the pump database. None or 1
+        runs the exploration sequentially, -1 uses one process per CPU.
+        In parallel, pvps_fixture is modified in the sub-processes only,
+        and the warnings raised there are raised again once the exploration
+        of the pump database is over. On platforms starting the processes
+        with 'spawn' (Windows, macOS), the calling script must be protected
+        by an ``if __name__ == '__main__':`` block.
+
     **kwargs: dict,
         Keyword arguments internally given to
         py:func:`PVPumpSystem.run_model()`. Made for giving the financial
@@ -602,6 +701,7 @@ def sizing_minimize_npv(pv_database, pump_database,
                                                     llp_accepted=llp_accepted,
                                                     M_s_guess=M_s_guess,
                                                     M_p_guess=M_p_guess,
+                                                    n_jobs=n_jobs,
                                                     **kwargs)
     elif pvps_fixture.coupling == 'mppt':
         preselection = subset_respecting_llp_mppt(pv_database,
@@ -611,6 +711,7 @@ def sizing_minimize_npv(pv_database, pump_database,
                                                   pvps_fixture,
                                                   llp_accepted=llp_accepted,
                                                   M_s_guess=M_s_guess,
+                                                  n_jobs=n_jobs,
                                                   **kwargs)
     else:
         raise ValueError('Unknown coupling method.')
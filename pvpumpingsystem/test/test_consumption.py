@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Tanguy Lunel
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pvpumpingsystem.consumption as cs
+
+
+def test_repeated_flow():
+    """Test that the repeated pattern is correctly spread over the index.
+    """
+    consum = cs.Consumption(repeated_flow=[0, 1, 2, 3, 4], length=12)
+    Q = consum.flow_rate.Qlpm.values
+    Q_expected = np.array([0, 1, 2, 3, 4, 0, 1, 2, 3, 4, 0, 1])
+    np.testing.assert_allclose(Q, Q_expected)
+
+    # whole number of repetitions
+    consum = cs.Consumption(repeated_flow=[0, 1, 2], length=6)
+    Q = consum.flow_rate.Qlpm.values
+    np.testing.assert_allclose(Q, [0, 1, 2, 0, 1, 2])
+
+
+def test_flow_rate_no_copy(monkeypatch):
+    """Test that the float32 array built for the flow rate is stored in
+    the flow_rate DataFrame without further copy, at construction and
+    when a float32 flow_rate is set.
+    """
+    built = []
+
+    def repeat_pattern(pattern, nb_data):
+        built.append(repeat_pattern_orig(pattern, nb_data))
+        return built[-1]
+
+    repeat_pattern_orig = cs._repeat_pattern
+    monkeypatch.setattr(cs, '_repeat_pattern', repeat_pattern)
+    consum = cs.Consumption(repeated_flow=[0, 1, 2], length=24)
+    Q = consum.flow_rate.Qlpm.to_numpy()
+    assert Q.dtype == np.float32
+    assert np.shares_memory(Q, built[0])
+
+    flow_rate = pd.DataFrame({'Qlpm': np.ones(24, dtype=np.float32)})
+    consum.flow_rate = flow_rate
+    assert np.shares_memory(consum.flow_rate.Qlpm.to_numpy(),
+                            flow_rate.Qlpm.to_numpy())
+
+
+def test_flow_rate_index_kept():
+    """Test that the index of the flow_rate given is kept as is, whether
+    it is a timezone aware DatetimeIndex or not a DatetimeIndex at all.
+    """
+    flow_rate = pd.DataFrame({'Qlpm': [1., np.nan]}, index=[0, 1])
+    consum = cs.Consumption(flow_rate=flow_rate)
+    assert consum.flow_rate.index.equals(flow_rate.index)
+    np.testing.assert_allclose(consum.flow_rate.Qlpm, [1, 0])
+
+    index = pd.date_range('2005-01-01', periods=3, freq='H',
+                          tz='Europe/Paris')
+    flow_rate = pd.DataFrame({'Qlpm': [1., 2., 3.]}, index=index)
+    consum = cs.Consumption(flow_rate=flow_rate)
+    assert consum.flow_rate.index.equals(index)
+    assert consum.flow_rate.index.tz == index.tz
+
+
+def test_flow_rate_modified_in_place():
+    """Test that a modification in place of flow_rate is kept, and seen
+    in the numpy array of the flow rate.
+    """
+    consum = cs.Consumption(constant_flow=1, length=24)
+    consum.flow_rate.iloc[0, 0] = 5
+    assert consum.flow_rate.Qlpm.iloc[0] == 5
+    assert consum._qlpm[0] == 5
+
+
+if __name__ == '__main__':
+    # runs all the tests in this module
+    pytest.main(['-s', 'test_consumption.py'])
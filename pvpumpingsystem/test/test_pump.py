@@ -150,6 +150,28 @@ def test_functIforVH(pumpset):
         functI(7, 120, error_raising=False)
 
 
+def test_functIforVH_theoretical_inverse(pumpset):
+    """
+    Test that the current given by the theoretical model is the inverse
+    of the model V(I, H), for arrays of voltage and for a small R_a.
+    """
+    pumpset.modeling_method = 'theoretical'
+    R_a, beta_0, beta_1, beta_2 = pumpset.coeffs['coeffs_f1']
+    functI, intervals = pumpset.functIforVH()
+
+    V = np.linspace(*intervals['V'](20), 10)
+    cur = functI(V, 20)
+    beta = beta_0 + beta_1*20 + beta_2*20**2
+    np.testing.assert_allclose(R_a*cur + beta*np.sqrt(cur), V, rtol=1e-9)
+
+    # small armature resistance, where the quadratic formula cancels out
+    pumpset.coeffs['coeffs_f1'][0] = 1e-12
+    pumpset._functions_cache.clear()
+    functI, _ = pumpset.functIforVH()
+    cur = functI(V, 20)
+    np.testing.assert_allclose(1e-12*cur + beta*np.sqrt(cur), V, rtol=1e-9)
+
+
 def test_functQforPH(pumpset):
     """
     Test whether the output functV works well,
@@ -174,6 +196,118 @@ def test_functQforPH(pumpset):
                                    rtol=0.05)
 
 
+def test_functQforPH_negative_flow(pumpset):
+    """
+    Test that a negative flow rate given by the curve fit is clipped to 0,
+    including in the domain of power where Kou and Hamidat models formerly
+    returned it as is.
+    """
+    for model, P, H in [('kou', 430, 63), ('hamidat', 110, 21),
+                        ('theoretical', 560, 79)]:
+        pumpset.modeling_method = model
+        functQ, intervals = pumpset.functQforPH()
+        P_min, P_max = intervals['P'](H)
+        assert P_min <= P <= P_max
+        assert functQ(P, H) == {'Q': 0, 'P_unused': 0}
+
+    # on a grid of points, in and out of the domain
+    P, H = np.meshgrid(np.linspace(0, 1000, 51), np.linspace(0, 90, 46))
+    for model in ['arab', 'kou', 'theoretical', 'hamidat']:
+        pumpset.modeling_method = model
+        functQ, _ = pumpset.functQforPH()
+        assert (functQ(P.ravel(), H.ravel())['Q'] >= 0).all()
+
+
+def test_functQforPH_arrays(pumpset):
+    """
+    Test that functQ gives the same results on arrays as on scalars.
+    """
+    P = np.array([100, 400, 560, 1000, np.nan])
+    H = np.array([20, 20, 81, 20, 20])
+    for model in ['arab', 'kou', 'theoretical', 'hamidat']:
+        pumpset.modeling_method = model
+        functQ, _ = pumpset.functQforPH()
+        res = functQ(P, H)
+        for i in range(len(P)):
+            res_expected = functQ(P[i], H[i])
+            np.testing.assert_allclose(res['Q'][i], res_expected['Q'])
+            np.testing.assert_allclose(res['P_unused'][i],
+                                       res_expected['P_unused'])
+
+
+@pytest.mark.filterwarnings("ignore::scipy.optimize.OptimizeWarning")
+def test_functQforPH_hamidat_roots():
+    """
+    Test that the Hamidat model finds on arrays the same root as on scalars
+    where the cubic has several roots in the domain. The array secant of
+    scipy.optimize.newton converges there to another root (3.40 lpm).
+    """
+    pump_testfile = os.path.join(test_dir,
+                                 '../data/pump_files/Shurflo_9325.txt')
+    pump = pp.Pump(path=pump_testfile, modeling_method='hamidat')
+    functQ, _ = pump.functQforPH()
+    P = np.array([51.47076923, 30, 60, 90])
+    H = np.array([59.96965517, 20, 40, 60])
+    res = functQ(P, H)
+    np.testing.assert_allclose(res['Q'][0], 1.824, rtol=1e-3)
+    for i in range(len(P)):
+        assert res['Q'][i] == functQ(P[i], H[i])['Q']
+
+
+def test_functQforVH_arrays(pumpset):
+    """
+    Test that functQforVH gives the same results on arrays as on scalars,
+    in and out of the domain of validity.
+    """
+    V = np.array([50, 80, 100, 120, 200])
+    H = np.array([20, 20, 40, 81, 20])
+    for model in ['arab', 'kou', 'theoretical']:
+        pumpset.modeling_method = model
+        functQ, _ = pumpset.functQforVH()
+        res = functQ(V, H)
+        for i in range(len(V)):
+            res_expected = functQ(V[i], H[i])
+            np.testing.assert_allclose(res['Q'][i], res_expected['Q'])
+            np.testing.assert_allclose(res['P_unused'][i],
+                                       res_expected['P_unused'])
+
+
+def test_functQforVH_hamidat(pumpset):
+    """
+    Test that functQforVH can be built with the Hamidat model, which has
+    no model for the current, and only raises once called.
+    """
+    pumpset.modeling_method = 'hamidat'
+    functQ, intervals = pumpset.functQforVH()
+    assert intervals['V'](20)[0] < intervals['V'](20)[1]
+    with pytest.raises(NotImplementedError):
+        functQ(80, 20)
+
+
+def test_functions_cache(pumpset):
+    """Test that the model functions are built once per modeling method.
+    """
+    functQ, _ = pumpset.functQforPH()
+    assert pumpset.functQforPH()[0] is functQ
+    # changing the modeling method rebuilds the functions
+    pumpset.modeling_method = 'kou'
+    assert pumpset.functQforPH()[0] is not functQ
+
+
+def test_coeffs_cache(pumpset):
+    """Test that a pump built from the same data gets the same
+    coefficients, without sharing them with the other pump.
+    """
+    pump_testfile = os.path.join(test_dir,
+                                 '../data/pump_files/SCB_10_150_120_BL.txt')
+    hits = pp._fit_curves_coeffs_cached.cache_info().hits
+    pump2 = pp.Pump(path=pump_testfile, modeling_method='arab')
+    assert pp._fit_curves_coeffs_cached.cache_info().hits == hits + 1
+    for key, value in pumpset.coeffs.items():
+        np.testing.assert_array_equal(pump2.coeffs[key], value)
+    assert pump2.coeffs['coeffs_f1'] is not pumpset.coeffs['coeffs_f1']
+
+
 def test_iv_curve_data(pumpset):
     """Test if the IV curve is as expected.
     """
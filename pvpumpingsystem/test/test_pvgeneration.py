@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Tanguy Lunel
+"""
+
+import os
+import inspect
+import shutil
+import pytest
+
+import pvpumpingsystem.pvgeneration as pvgen
+
+
+test_dir = os.path.dirname(
+    os.path.abspath(inspect.getfile(inspect.currentframe())))
+
+
+def test_read_epw_cached(tmp_path):
+    """Test that the weather file is parsed once, that the data returned
+    can be modified without altering the cache, and that the file is
+    parsed again once modified.
+    """
+    weather_path = str(tmp_path / 'weather.epw')
+    shutil.copy(os.path.join(
+        test_dir,
+        '../data/weather_files/CAN_PQ_Montreal.Intl.AP.716270_CWEC.epw'),
+        weather_path)
+
+    misses = pvgen._read_epw.cache_info().misses
+    weather_data, metadata = pvgen.read_epw_cached(weather_path)
+    weather_data['ghi'] = 0
+    metadata['city'] = 'nowhere'
+    weather_data_2, metadata_2 = pvgen.read_epw_cached(weather_path)
+    assert pvgen._read_epw.cache_info().misses == misses + 1
+    assert weather_data_2.ghi.max() > 0
+    assert metadata_2['city'] != 'nowhere'
+
+    # a new modification time invalidates the cached data
+    mtime = os.path.getmtime(weather_path)
+    os.utime(weather_path, (mtime + 10, mtime + 10))
+    pvgen.read_epw_cached(weather_path)
+    assert pvgen._read_epw.cache_info().misses == misses + 2
+
+
+if __name__ == '__main__':
+    # runs all the tests in this module
+    pytest.main(['-s', 'test_pvgeneration.py'])
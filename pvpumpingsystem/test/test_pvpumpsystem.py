@@ -125,6 +125,33 @@ def test_calc_flow_direct(pvps_set_up):
     np.testing.assert_allclose(Q, Q_expected, rtol=1)
 
 
+def test_calc_efficiency(pvps_set_up):
+    """Test the computing of efficiencies, including at night when the
+    irradiance is null, and with a flow computed on part of the weather.
+    """
+    pvps_set_up.coupling = 'mppt'
+    pvps_set_up.calc_flow(friction=False, stop=24)
+    pvps_set_up.calc_efficiency()
+    eff = pvps_set_up.efficiency
+    assert len(eff) == len(pvps_set_up.pvgeneration.weather_data)
+    eff_expected = np.array(
+        [[0., 0., 0., np.nan, np.nan, np.nan],
+         [0., 0., 0., np.nan, np.nan, np.nan],
+         [253.638902, 55.647921, 1622.907164, 0.219398, 0.156287, 0.034289],
+         [504.962910, 86.638589, 3283.183818, 0.171574, 0.153803, 0.026389],
+         [653.651233, 97.013983, 4286.455950, 0.148419, 0.152492, 0.022633],
+         [744.731816, 100.042337, 4884.999836, 0.134333, 0.152453, 0.020479],
+         [380.870046, 73.449579, 2423.902104, 0.192847, 0.157131, 0.030302],
+         [344.361321, 68.784665, 2185.927864, 0.199746, 0.157536, 0.031467],
+         [258.630869, 56.428036, 1641.431743, 0.218180, 0.157564, 0.034377],
+         [101.358159, 28.645422, 646.501943, 0.282616, 0.156779, 0.044308],
+         [0., 0., 0., np.nan, np.nan, np.nan]])
+    np.testing.assert_allclose(eff.iloc[6:17].to_numpy(), eff_expected,
+                               rtol=1e-4, atol=1e-6)
+    # no flow computed after 'stop'
+    assert eff.electric_power.iloc[24:].isna().all()
+
+
 def test_operating_point(pvps_set_up):
     """Test the ability of code to find the operating point between
     pump and pv array when directly-coupled.
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Tanguy Lunel
+"""
+
+import numpy as np
+import pytest
+
+import pvpumpingsystem.reservoir as rv
+
+
+@pytest.mark.parametrize('quantities', [
+    [10.5, -3.2, np.nan, 20, -15.1],  # never empty nor full
+    [300, 400, np.nan, 500, -100, 200],  # overflow
+    [-20, 30, -100, np.nan, 15],  # underflow
+    [600, -900, np.nan, 250, -30, 1200, -2000],  # both
+    ])
+def test_change_water_volume_series(quantities):
+    """Test that the series of quantities gives the same volumes as
+    successive calls of change_water_volume().
+    """
+    reservoir_scalar = rv.Reservoir(size=1000, water_volume=50)
+    reservoir_series = rv.Reservoir(size=1000, water_volume=50)
+
+    results = [reservoir_scalar.change_water_volume(q) for q in quantities]
+    volume_expected, extra_expected = np.array(results, dtype=float).T
+    volume, extra_water = reservoir_series.change_water_volume_series(
+        quantities)
+
+    np.testing.assert_allclose(volume, volume_expected, rtol=1e-12)
+    np.testing.assert_allclose(extra_water, extra_expected, rtol=1e-12)
+    np.testing.assert_allclose(reservoir_series.water_volume,
+                               reservoir_scalar.water_volume, rtol=1e-12)
+
+
+def test_change_water_volume_series_empty():
+    """Test that an empty series leaves the reservoir unchanged.
+    """
+    reservoir = rv.Reservoir(size=1000, water_volume=50)
+    volume, extra_water = reservoir.change_water_volume_series([])
+    assert len(volume) == 0 and len(extra_water) == 0
+    assert reservoir.water_volume == 50
+
+
+if __name__ == '__main__':
+    # runs all the tests in this module
+    pytest.main(['-s', 'test_reservoir.py'])
@@ -6,6 +6,7 @@
 
 import pytest
 import pvlib
+import pandas as pd
 import os
 import inspect
 
@@ -171,6 +172,41 @@ def test_sizing_minimize_npv_direct(databases):
             'Canadian_Solar_Inc__CS5C_80M' in selection.pv_module.values)
 
 
+@pytest.mark.filterwarnings("ignore::scipy.optimize.OptimizeWarning")
+def test_subset_respecting_llp_direct_n_jobs(databases):
+    """
+    Checks that the exploration of the pump database in two processes
+    gives the same configurations and warnings as the sequential one.
+    """
+    weather_path = os.path.join(
+        test_dir,
+        '../data/weather_files/CAN_PQ_Montreal.Intl.AP.716270_CWEC.epw')
+    weather_data, weather_metadata = pvlib.iotools.epw.read_epw(
+            weather_path, coerce_year=2005)
+    weather_shrunk = siz.shrink_weather_representative(weather_data)
+
+    results = {}
+    messages = {}
+    for n_jobs in [1, 2]:
+        pvps_fixture = pvps.PVPumpSystem(
+            None, None, coupling='direct', mppt=databases['mppt'],
+            consumption=cs.Consumption(constant_flow=1),
+            reservoir=res.Reservoir(size=5000),
+            pipes=pn.PipeNetwork(h_stat=20, l_tot=100, diam=0.08,
+                                 material='plastic', optimism=True))
+        with pytest.warns(UserWarning) as record:
+            results[n_jobs] = siz.subset_respecting_llp_direct(
+                databases['pv_modules'], databases['pumps'],
+                weather_shrunk, weather_metadata,
+                pvps_fixture, llp_accepted=0.01, M_s_guess=1,
+                n_jobs=n_jobs)
+        messages[n_jobs] = [str(w.message) for w in record
+                            if 'do not match' in str(w.message)]
+
+    pd.testing.assert_frame_equal(results[2], results[1])
+    assert messages[2] == messages[1] != []
+
+
 if __name__ == '__main__':
     # test all the tests in the module
     pytest.main(['test_sizing.py'])